@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Compares the check latency of the quantified and grounded encodings.
+
+Every shipped model is checked against the use-case presets, each preset is turned into
+a module with one component per license of the model. The verdicts of both encodings are compared.
+
+Usage: python benchmarks/encoding.py [--licenses N] [--presets N]
+"""
+
+import sys
+import time
+import argparse
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from ts_legalcheck.engine import ENCODINGS, createEngineWithDefinitions, loadDefinitions
+from ts_legalcheck.engine.context import Component, Module
+from ts_legalcheck.utils import load_file
+
+
+DATA = Path(__file__).resolve().parent.parent / 'data'
+
+MODELS = [
+    'LicenseConstraints_v4.3.json',
+    'LicenseConstraints_v4.4.json',
+    'LicenseConstraints_v4.5.toml',
+    'LicenseConstraints_v5.0.toml',
+    'osadl/LicenseConstraints_v1.0.toml'
+]
+
+
+def makeModules(defs: dict, presets: int, licenses: int):
+    lics = sorted(defs.get('Constraints', {}).keys())
+    if licenses > 0:
+        lics = lics[:licenses]
+
+    for path in sorted((DATA / 'use-cases' / 'presets').iterdir())[:presets]:
+        settings = load_file(path)
+        comps = [Component(f'c{i}', dict(settings.get('component', {}), modified=bool(i % 2)), [l]) for i, l in enumerate(lics)]
+        yield path.name, Module(path.stem, settings.get('module', {}), comps)
+
+
+def verdicts(result: dict):
+    return {(c, l): (r['status'], sorted(r.get('rules', []))) for c, lics in result.items() for l, r in lics.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--licenses', type=int, default=20, help='Number of licenses per model, 0 for all')
+    parser.add_argument('--presets', type=int, default=5, help='Number of use-case presets')
+    args = parser.parse_args()
+
+    print(f'{"model":40} {"encoding":12} {"build [s]":>10} {"check [s]":>10} {"per license [ms]":>17}')
+
+    for model in MODELS:
+        defs = loadDefinitions(DATA / model)
+        modules = list(makeModules(defs, args.presets, args.licenses))
+        checks = sum(len(m.components) for _, m in modules)
+
+        results = {}
+        for encoding in ENCODINGS:
+            start = time.perf_counter()
+            engine = createEngineWithDefinitions(defs, encoding=encoding)
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            results[encoding] = {name: verdicts(engine.checkModule(mod)) for name, mod in modules}
+            check = time.perf_counter() - start
+
+            print(f'{model:40} {encoding:12} {build:10.2f} {check:10.2f} {1000 * check / max(checks, 1):17.1f}')
+
+        if len({str(r) for r in results.values()}) > 1:
+            print(f'{model}: verdicts of the encodings differ', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
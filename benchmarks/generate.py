@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Generates synthetic module files for stress testing in the format read by Module.load.
+
+Every module is based on one of the use-case presets. Its components get licenses of the model,
+drawn uniformly or following a Zipf distribution, which resembles real projects dominated by
+a few permissive licenses. Settings of the preset are flipped randomly with the given probability,
+components are modified with the given ratio. The output is deterministic for a seed.
+
+The generated directory can be passed to the check-batch command directly.
+
+Usage: python benchmarks/generate.py -o DIR [--modules N] [--components N] [--model MODEL] [--seed N]
+"""
+
+import sys
+import json
+import random
+import argparse
+import typing as t
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from ts_legalcheck.engine import loadDefinitions
+from ts_legalcheck.engine.context import Module
+from ts_legalcheck.utils import load_file
+
+from encoding import MODELS, DATA
+
+
+DISTRIBUTIONS = ('uniform', 'zipf')
+
+
+def loadPresets() -> t.List[t.Tuple[str, dict]]:
+    return [(p.stem, load_file(p) or {}) for p in sorted((DATA / 'use-cases' / 'presets').iterdir())]
+
+
+def licenseWeights(licenses: t.List[str], distribution: str, exponent: float, rnd: random.Random) -> t.List[float]:
+    if distribution == 'uniform':
+        return [1.0] * len(licenses)
+
+    # The popularity rank of a license is random, but fixed by the seed
+    ranks = list(range(1, len(licenses) + 1))
+    rnd.shuffle(ranks)
+    return [1.0 / r ** exponent for r in ranks]
+
+
+def generateModule(key: str,
+                   licenses: t.List[str],
+                   preset: dict,
+                   components: int,
+                   distribution: str = 'zipf',
+                   exponent: float = 1.2,
+                   dual: float = 0.1,
+                   modified: float = 0.2,
+                   randomize: float = 0.0,
+                   seed: int = 0) -> t.Dict[str, t.Any]:
+    """
+    Returns the data of a module file with the given number of components.
+    dual is the ratio of components with two licenses, modified the ratio of modified components
+    and randomize the probability of flipping a setting of the preset.
+    """
+    rnd = random.Random(seed)
+
+    def settings(values: t.Dict[str, bool]) -> t.Dict[str, bool]:
+        return {k: (not v) if rnd.random() < randomize else bool(v) for k, v in values.items()}
+
+    weights = licenseWeights(licenses, distribution, exponent, rnd)
+
+    data: t.Dict[str, t.Any] = dict(key=key, **settings(preset.get('module', {})))
+    data['components'] = {}
+
+    for i in range(components):
+        count = 2 if rnd.random() < dual and len(licenses) > 1 else 1
+        lics = set()
+        while len(lics) < count:
+            lics.add(rnd.choices(licenses, weights)[0])
+
+        comp = settings({k: v for k, v in preset.get('component', {}).items() if k != 'modified'})
+        comp['modified'] = rnd.random() < modified
+        comp['licenses'] = sorted(lics)
+
+        data['components'][f'c{i}'] = comp
+
+    return data
+
+
+def generateModules(defs: dict, modules: int, components: int, seed: int = 0, **kwargs) -> t.Iterator[t.Dict[str, t.Any]]:
+    """
+    Generates module files with licenses of the definitions, the presets are used in turn.
+    """
+    licenses = sorted(defs.get('Constraints', {}).keys())
+    presets = loadPresets()
+
+    for i in range(modules):
+        name, preset = presets[i % len(presets)]
+        yield generateModule(f'{name}-{i}', licenses, preset, components, seed=seed + i, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', '-o', type=Path, required=True, help='Directory to write the module files to')
+    parser.add_argument('--model', choices=MODELS, default='LicenseConstraints_v4.5.toml', help='Model to draw the licenses from')
+    parser.add_argument('--modules', type=int, default=1, help='Number of module files')
+    parser.add_argument('--components', type=int, default=1000, help='Number of components per module')
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='zipf', help='Distribution of the licenses')
+    parser.add_argument('--exponent', type=float, default=1.2, help='Exponent of the Zipf distribution')
+    parser.add_argument('--dual', type=float, default=0.1, help='Ratio of components with two licenses')
+    parser.add_argument('--modified', type=float, default=0.2, help='Ratio of modified components')
+    parser.add_argument('--randomize', type=float, default=0.0, help='Probability of flipping a setting of the preset')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the generator')
+    args = parser.parse_args()
+
+    defs = loadDefinitions(DATA / args.model)
+    args.output.mkdir(parents=True, exist_ok=True)
+
+    for data in generateModules(defs, args.modules, args.components, seed=args.seed, distribution=args.distribution,
+                                exponent=args.exponent, dual=args.dual, modified=args.modified, randomize=args.randomize):
+        path = args.output / f'{data["key"]}.json'
+        with path.open('w') as fp:
+            json.dump(data, fp, indent=2)
+
+        # The generated files must be readable by the engine
+        if Module.load(path) is None:
+            print(f'{path}: cannot be loaded', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
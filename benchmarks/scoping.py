@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Compares the check latency of solver scopes with the incremental mode, in which the facts
+of the checked objects are switched on by assumed indicator literals.
+
+A module with many components is generated for every shipped model, the components get
+random settings of the use-case presets and one or two licenses of the model.
+The verdicts of both modes are compared.
+
+Usage: python benchmarks/scoping.py [--components N] [--models N]
+"""
+
+import sys
+import time
+import random
+import argparse
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from ts_legalcheck.engine import ENCODINGS, ENCODING_GROUNDED, createEngineWithDefinitions, loadDefinitions
+from ts_legalcheck.engine.context import Component, Module
+from ts_legalcheck.utils import load_file
+
+from encoding import MODELS, DATA, verdicts
+
+
+def makeModule(defs: dict, components: int) -> Module:
+    rnd = random.Random(0)
+
+    presets = [load_file(p) for p in sorted((DATA / 'use-cases' / 'presets').iterdir())]
+    settings = sorted({k for p in presets for k in p.get('component', {})})
+    lics = sorted(defs.get('Constraints', {}).keys())
+
+    comps = [Component(f'c{i}', {k: rnd.random() < 0.5 for k in settings}, rnd.sample(lics, min(len(lics), rnd.randint(1, 2))))
+             for i in range(components)]
+
+    return Module('benchmark', presets[0].get('module', {}), comps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--components', type=int, default=1000, help='Number of components of the module')
+    parser.add_argument('--models', type=int, default=len(MODELS), help='Number of models')
+    parser.add_argument('--encoding', choices=ENCODINGS, default=ENCODING_GROUNDED, help='Encoding of the facts')
+    args = parser.parse_args()
+
+    print(f'{"model":40} {"mode":12} {"check [s]":>10} {"per component [ms]":>19}')
+
+    for model in MODELS[:args.models]:
+        defs = loadDefinitions(DATA / model)
+        mod = makeModule(defs, args.components)
+
+        results = {}
+        for mode, incremental in (('scopes', False), ('incremental', True)):
+            engine = createEngineWithDefinitions(defs, encoding=args.encoding)
+            engine.configure(incremental=incremental)
+
+            start = time.perf_counter()
+            results[mode] = verdicts(engine.checkModule(mod))
+            check = time.perf_counter() - start
+
+            print(f'{model:40} {mode:12} {check:10.2f} {1000 * check / args.components:19.2f}')
+
+        if len({str(r) for r in results.values()}) > 1:
+            print(f'{model}: verdicts of the modes differ', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite of the engine on all shipped models, written as a JSON report.
+
+For every model the suite measures loading the definitions, building the engine,
+SAT and UNSAT license checks and the MUS enumeration of violations for every use-case preset,
+and checking modules of increasing numbers of components created by generate.py, one module per preset.
+
+Every measurement contains the time in seconds, the peak of the memory allocated by Python
+during the measurement (unless --no-memory is given) and the maximal resident size of the process
+so far, which includes the memory of the solver. Reports of two versions can be compared by their keys.
+
+Usage: python benchmarks/suite.py [-o report.json] [--models NAME ...] [--sizes N ...] [--licenses N]
+"""
+
+import sys
+import json
+import time
+import platform
+import resource
+import argparse
+import tracemalloc
+import typing as t
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+import z3
+
+from ts_legalcheck.engine import (ENCODINGS, ENCODING_GROUNDED, EXPLAIN_ALL, EXPLAIN_MUS,
+                                  createEngineWithDefinitions, loadDefinitions)
+from ts_legalcheck.engine.context import Component, Module
+from ts_legalcheck.utils import load_file
+
+from encoding import MODELS, DATA
+from generate import generateModules
+
+
+def maxRss() -> int:
+    # Kilobytes on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def measure(memory: bool, f: t.Callable[..., t.Any], *args, **kwargs) -> t.Tuple[t.Any, t.Dict[str, t.Any]]:
+    if memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    result = f(*args, **kwargs)
+    stats: t.Dict[str, t.Any] = {'time': time.perf_counter() - start}
+
+    if memory:
+        stats['peak'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    stats['maxRss'] = maxRss()
+    return result, stats
+
+
+def summarize(samples: t.List[t.Dict[str, t.Any]]) -> t.Dict[str, t.Any]:
+    if not samples:
+        return {'count': 0}
+
+    times = sorted(s['time'] for s in samples)
+    summary = {
+        'count': len(samples),
+        'time': sum(times) / len(times),
+        'min': times[0],
+        'max': times[-1],
+        'maxRss': max(s['maxRss'] for s in samples)
+    }
+
+    if all('peak' in s for s in samples):
+        summary['peak'] = max(s['peak'] for s in samples)
+
+    return summary
+
+
+def checkLicense(engine, mod: Module, comp: Component, lic: str) -> t.Dict[str, t.Any]:
+    engine.push(mod)
+    engine.push(comp)
+    try:
+        return engine.checkLicense(engine.licenses[lic], extended_results=False)
+    finally:
+        engine.pop(Component)
+        engine.pop(Module)
+
+
+def benchmarkPreset(engine, path: Path, lics: t.List[str], memory: bool) -> t.Dict[str, t.Any]:
+    settings = load_file(path) or {}
+    mod = Module(path.stem, settings.get('module', {}))
+    comp = Component('c', settings.get('component', {}), [])
+
+    samples: t.Dict[str, t.List[t.Dict[str, t.Any]]] = {'sat': [], 'unsat': [], 'mus': []}
+
+    for lic in lics:
+        engine.configure(explanation=EXPLAIN_ALL)
+        result, stats = measure(memory, checkLicense, engine, mod, comp, lic)
+
+        if result['status'] == 'SAT':
+            samples['sat'].append(stats)
+        else:
+            samples['unsat'].append(stats)
+
+            engine.configure(explanation=EXPLAIN_MUS)
+            _, stats = measure(memory, checkLicense, engine, mod, comp, lic)
+            samples['mus'].append(stats)
+
+    engine.configure(explanation=EXPLAIN_ALL)
+    return {k: summarize(v) for k, v in samples.items()}
+
+
+def benchmarkModel(model: str, args: argparse.Namespace) -> t.Dict[str, t.Any]:
+    report: t.Dict[str, t.Any] = {}
+
+    defs, report['load'] = measure(args.memory, loadDefinitions, DATA / model)
+    engine, report['build'] = measure(args.memory, createEngineWithDefinitions, defs, encoding=args.encoding)
+
+    lics = sorted(engine.licenses.keys())
+    if args.licenses > 0:
+        lics = lics[:args.licenses]
+
+    report['presets'] = {}
+    for path in sorted((DATA / 'use-cases' / 'presets').iterdir()):
+        report['presets'][path.stem] = benchmarkPreset(engine, path, lics, args.memory)
+        print(f'{model}: {path.stem} {report["presets"][path.stem]}', file=sys.stderr)
+
+    report['modules'] = {}
+    for size in args.sizes:
+        report['modules'][str(size)] = {}
+
+        # The presets are used in turn by the generated modules
+        for data in generateModules(defs, len(report['presets']), size):
+            mod = t.cast(Module, Module.load(json.dumps(data)))
+            preset = mod.key.rsplit('-', 1)[0]
+
+            # A new engine is built for every module, so that the modules do not share learned facts
+            engine = createEngineWithDefinitions(defs, encoding=args.encoding)
+            _, stats = measure(args.memory, engine.checkModule, mod, extended_results=False)
+
+            report['modules'][str(size)][preset] = dict(stats, **engine.statistics)
+            print(f'{model}: {size} components {preset} {report["modules"][str(size)][preset]}', file=sys.stderr)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', '-o', type=argparse.FileType('w'), default='-', help='File to write the JSON report to')
+    parser.add_argument('--models', nargs='+', choices=MODELS, default=MODELS, help='Models to benchmark')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10, 100, 1000, 10000], help='Numbers of components of the checked modules')
+    parser.add_argument('--licenses', type=int, default=10, help='Number of licenses checked per preset, 0 for all')
+    parser.add_argument('--encoding', choices=ENCODINGS, default=ENCODING_GROUNDED, help='Encoding of the facts')
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='Do not trace the memory allocated by Python')
+    args = parser.parse_args()
+
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'z3': z3.get_version_string(),
+            'platform': platform.platform(),
+            'encoding': args.encoding,
+            'memory': args.memory,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z')
+        },
+        'models': {}
+    }
+
+    for model in args.models:
+        report['models'][model] = benchmarkModel(model, args)
+
+    json.dump(report, args.output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Compares the check latency of the solver with the decision tables.
+
+Every shipped model is checked against the use-case presets, each preset is turned into
+a module with one component per license of the model. The verdicts of the tables are compared
+with the verdicts of the solver.
+
+Usage: python benchmarks/tables.py [--licenses N] [--presets N] [--encoding ENCODING]
+"""
+
+import sys
+import time
+import argparse
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from ts_legalcheck.engine import ENCODINGS, ENCODING_GROUNDED, createEngineWithDefinitions, loadDefinitions
+from ts_legalcheck.engine.tables import FastEngine
+
+from encoding import MODELS, DATA, makeModules, verdicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--licenses', type=int, default=20, help='Number of licenses per model, 0 for all')
+    parser.add_argument('--presets', type=int, default=5, help='Number of use-case presets')
+    parser.add_argument('--encoding', choices=ENCODINGS, default=ENCODING_GROUNDED, help='Encoding of the solver engine')
+    args = parser.parse_args()
+
+    print(f'{"model":40} {"compile [s]":>11} {"solver [ms]":>12} {"tables [ms]":>12} {"answered":>9}')
+
+    for model in MODELS:
+        defs = loadDefinitions(DATA / model)
+        modules = list(makeModules(defs, args.presets, args.licenses))
+        checks = sum(len(m.components) for _, m in modules)
+
+        engine = createEngineWithDefinitions(defs, encoding=args.encoding)
+
+        start = time.perf_counter()
+        expected = {name: verdicts(engine.checkModule(mod)) for name, mod in modules}
+        solver = time.perf_counter() - start
+
+        # The tables are compiled on a fresh engine, they must not depend on the checks run before
+        fast = FastEngine(createEngineWithDefinitions(defs, encoding=args.encoding))
+
+        start = time.perf_counter()
+        for _, mod in modules:
+            for lic in {l for c in mod.components for l in c.licenses}:
+                fast.table(lic)
+        compiled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = {name: fast.checkModule(mod) for name, mod in modules}
+        tables = time.perf_counter() - start
+
+        actual = {name: verdicts(r) for name, r in results.items()}
+
+        stats = fast.statistics
+        answered = f'{stats["tables"]}/{stats["tables"] + stats["solver"]}'
+
+        print(f'{model:40} {compiled:11.2f} {1000 * solver / max(checks, 1):12.2f} {1000 * tables / max(checks, 1):12.2f} {answered:>9}')
+
+        if actual != expected:
+            print(f'{model}: verdicts of the tables differ from the solver', file=sys.stderr)
+
+        if {name: FastEngine(engine).checkModule(mod) for name, mod in modules} != results:
+            print(f'{model}: tables compiled after the checks differ from the tables of a fresh engine', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
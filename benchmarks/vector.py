@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Measures the throughput of the vectorized checks.
+
+The use-case presets are randomly varied into a matrix of use-cases, which is checked
+for the licenses of every shipped model at once. Requires numpy.
+
+Usage: python benchmarks/vector.py [--licenses N] [--use-cases N] [--flips P]
+"""
+
+import sys
+import time
+import argparse
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+import numpy as np
+
+from ts_legalcheck.engine import ENCODING_GROUNDED, createEngineWithDefinitions, loadDefinitions
+from ts_legalcheck.engine.tables import FastEngine
+from ts_legalcheck.engine.vector import checkMatrix, fromUseCases
+from ts_legalcheck.utils import load_file
+
+from encoding import MODELS, DATA
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--licenses', type=int, default=20, help='Number of licenses per model, 0 for all')
+    parser.add_argument('--use-cases', type=int, default=100000, help='Number of use-cases')
+    parser.add_argument('--flips', type=float, default=0.1, help='Probability of flipping a setting of a preset')
+    args = parser.parse_args()
+
+    presets, names = fromUseCases(load_file(p) for p in sorted((DATA / 'use-cases' / 'presets').iterdir()))
+
+    rng = np.random.default_rng(0)
+    values = presets[rng.integers(0, len(presets), args.use_cases)] ^ (rng.random((args.use_cases, len(names))) < args.flips)
+
+    print(f'{"model":40} {"compile [s]":>11} {"check [s]":>10} {"checks/s":>12} {"individual":>11}')
+
+    for model in MODELS:
+        defs = loadDefinitions(DATA / model)
+        engine = createEngineWithDefinitions(defs, encoding=ENCODING_GROUNDED)
+
+        lics = sorted(engine.licenses)
+        if args.licenses > 0:
+            lics = lics[:args.licenses]
+
+        fast = FastEngine(engine)
+
+        start = time.perf_counter()
+        for lic in lics:
+            fast.table(lic)
+        compiled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = checkMatrix(fast, values, names, lics)
+        check = time.perf_counter() - start
+
+        checks = len(result.licenses) * args.use_cases
+        print(f'{model:40} {compiled:11.2f} {check:10.2f} {checks / check:12.0f} {result.individual:11}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,166 @@
+import os
+import sys
 import json
 import click
 import pathlib
 import typing as t
 
+# The engine, the solver and the parser are imported by the commands needing them to keep the startup fast
+from .options import ENCODINGS, ENCODING_QUANTIFIED, EXPLANATIONS, EXPLAIN_MUS
+from .utils import setup_logging, logger
 
-from .engine import createEngineWithDefinitions, loadDefinitions
-from .engine.context import Component, Module
-from .utils import setup_logging
+def _createEngine(paths: t.List[pathlib.Path], 
+                  snapshot: t.Optional[pathlib.Path] = None, 
+                  encoding: t.Optional[str] = None,
+                  cache: t.Optional[pathlib.Path] = None,
+                  cacheSize: t.Optional[int] = None):
+    from .engine import EngineError, createEngine, createEngineWithSnapshot
+    from .engine.cache import ResultCache, DEFAULT_CACHE_SIZE
 
-def _createEngine(paths: t.List[pathlib.Path]):
-    defs = loadDefinitions(paths)
-    return createEngineWithDefinitions(defs)
+    if snapshot:
+        try:
+            engine = createEngineWithSnapshot(snapshot, paths, encoding=encoding)
+        except EngineError as err:
+            raise click.ClickException(str(err))
+    else:
+        engine = createEngine(paths, encoding=encoding or ENCODING_QUANTIFIED)
+
+    if cache or cacheSize:
+        engine.cache = ResultCache(cache, size=(cacheSize * 1024 * 1024) if cacheSize else DEFAULT_CACHE_SIZE)
+
+    return engine
+
+
+def _configureEngine(engine, 
+                     explanation: t.Optional[str], 
+                     maxCores: t.Optional[int], 
+                     explanationTimeout: t.Optional[float],
+                     incremental: bool = False,
+                     solverStatistics: bool = False,
+                     slicing: bool = True,
+                     prepareUseCases: bool = False,
+                     **budgets: t.Any):
+    # Bounds of the explanation apply to the MUS enumeration
+    if explanation is None and (maxCores or explanationTimeout):
+        explanation = EXPLAIN_MUS
+
+    engine.configure(explanation=explanation, maxCores=maxCores, explanationTimeout=explanationTimeout, 
+                     incremental=incremental, solverStatistics=solverStatistics, slicing=slicing, 
+                     prepareUseCases=prepareUseCases, **budgets)
+
+
+def _closeEngine(engine):
+    logger.info(f'Engine: {engine.statistics}')
+    if engine.cache is not None:
+        logger.info(f'Result cache: {engine.cache.statistics}')
+        engine.cache.prune()
+        engine.cache.close()
+
+
+def _startProfile(enabled: bool):
+    if not enabled:
+        return None
+
+    from .engine.instrumentation import Profile, setInstrumentation
+
+    profile = Profile()
+    setInstrumentation(profile)
+    return profile
+
+
+def _reportProfile(profile):
+    if profile is not None:
+        click.echo(profile.report(), err=True)
+
+
+def _profileOption(f):
+    return click.option('--profile', 'profile', default=False, is_flag=True, required=False, 
+                        help='Print the time spent in the engine phases, checks in worker processes are not included')(f)
+
+
+def _encodingOption(f):
+    return click.option('--encoding', '-e', 'encoding', type=click.Choice(ENCODINGS), envvar='TS_LEGALCHECK_ENCODING', 
+                        required=False, help='Encoding of the facts, grounded facts are instantiated per checked license')(f)
+
+
+def _explanationOptions(f):
+    f = click.option('--explain-timeout', 'explanationTimeout', type=float, envvar='TS_LEGALCHECK_EXPLAIN_TIMEOUT', required=False,
+                     help='Time budget in seconds of explaining a violation')(f)
+    f = click.option('--max-cores', 'maxCores', type=click.IntRange(min=1), envvar='TS_LEGALCHECK_MAX_CORES', required=False,
+                     help='Maximal number of unsatisfiable cores explaining a violation')(f)
+    f = click.option('--incremental', 'incremental', default=False, is_flag=True, envvar='TS_LEGALCHECK_INCREMENTAL', required=False,
+                     help='Keep a single solver scope and switch the facts of the checked objects by assumptions')(f)
+    f = click.option('--solver-statistics', 'solverStatistics', default=False, is_flag=True, envvar='TS_LEGALCHECK_SOLVER_STATISTICS', 
+                     required=False, help='Include the statistics of the solver in the check results')(f)
+    f = click.option('--slicing/--no-slicing', 'slicing', default=True, envvar='TS_LEGALCHECK_SLICING', required=False,
+                     help='Assume only the rules, which may affect the checked license')(f)
+    f = click.option('--prepare', 'prepareUseCases', default=False, is_flag=True, envvar='TS_LEGALCHECK_PREPARE', required=False,
+                     help='Substitute the module properties into the grounded facts once for all components of a module')(f)
+    return click.option('--explain', 'explanation', type=click.Choice(EXPLANATIONS), envvar='TS_LEGALCHECK_EXPLAIN', required=False,
+                        help='Explanation of violations: all subsets, only minimal unsatisfiable cores or the first core')(f)
+
+
+def _budgetOptions(f):
+    f = click.option('--module-rlimit', 'moduleRlimit', type=click.IntRange(min=1), envvar='TS_LEGALCHECK_MODULE_RLIMIT', required=False,
+                     help='Resource budget of the solver (rlimit) of all checks of a module')(f)
+    f = click.option('--module-timeout', 'moduleTimeout', type=float, envvar='TS_LEGALCHECK_MODULE_TIMEOUT', required=False,
+                     help='Time budget in seconds of all checks of a module')(f)
+    f = click.option('--check-rlimit', 'checkRlimit', type=click.IntRange(min=1), envvar='TS_LEGALCHECK_CHECK_RLIMIT', required=False,
+                     help='Resource budget of the solver (rlimit) of a license check')(f)
+    return click.option('--check-timeout', 'checkTimeout', type=float, envvar='TS_LEGALCHECK_CHECK_TIMEOUT', required=False,
+                        help='Time budget in seconds of a license check, exceeded checks are UNKNOWN')(f)
+
+
+def _cacheOptions(f):
+    f = click.option('--cache-size', 'cacheSize', type=int, envvar='TS_LEGALCHECK_CACHE_SIZE', required=False,
+                     help='Size of the in-memory result cache in MB, enables the cache')(f)
+    return click.option('--cache', 'cache', type=click.Path(dir_okay=False, path_type=pathlib.Path), envvar='TS_LEGALCHECK_CACHE',
+                        required=False, help='Result cache database shared across runs, enables the cache')(f)
+
+
+def _profileStartup(args: t.List[str]) -> int:
+    """
+    Runs the command in a child interpreter reporting the import time of every module 
+    and prints the modules sorted by their own import time.
+    """
+    import subprocess
+
+    # The child imports the package from the same paths, e.g. the sources added by a launcher script
+    paths = [os.path.abspath(p) for p in sys.path if p] + [p for p in os.environ.get('PYTHONPATH', '').split(os.pathsep) if p]
+    env = dict(os.environ, PYTHONPROFILEIMPORTTIME='1', PYTHONPATH=os.pathsep.join(dict.fromkeys(paths)))
+    proc = subprocess.run([sys.executable, '-m', 'ts_legalcheck.cli'] + args, env=env, stderr=subprocess.PIPE, text=True)
+
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            print(line, file=sys.stderr)
+            continue
+
+        fields = line[len('import time:'):].split('|')
+        if fields[0].strip().isdigit():
+            imports.append((int(fields[0]), int(fields[1]), fields[2].strip()))
+
+    if proc.returncode != 0 or not imports:
+        print(f'The profiled command failed with exit code {proc.returncode}', file=sys.stderr)
+        return proc.returncode or 1
+
+    print(f'{"self [ms]":>10} {"cumulative [ms]":>16}  module', file=sys.stderr)
+    for own, cumulative, name in sorted(imports, reverse=True):
+        print(f'{own / 1000:10.1f} {cumulative / 1000:16.1f}  {name}', file=sys.stderr)
+
+    print(f'{sum(own for own, _, _ in imports) / 1000:10.1f} {"":16}  total of {len(imports)} modules', file=sys.stderr)
+    return 0
+
+
+def _startupProfileOption(ctx, param, value):
+    # Handled eagerly, so that the startup of --help is profiled as well
+    if value and not ctx.resilient_parsing:
+        ctx.exit(_profileStartup([a for a in sys.argv[1:] if a != '--startup-profile']))
 
 
 @click.group()
+@click.option('--startup-profile', default=False, is_flag=True, required=False, is_eager=True, expose_value=False,
+              callback=_startupProfileOption, help='Report the import time of every module loaded by the command')
 def cli():
     pass
 
@@ -21,45 +168,230 @@ def cli():
 @cli.command()
 @click.option('--defs', '-d', 'defs', type=click.Path(exists=True, path_type=pathlib.Path), default=[],
               multiple=True, required=False, help='File with constraints definitions')
+@click.option('--snapshot', '-s', 'snapshot', type=click.Path(dir_okay=False, path_type=pathlib.Path), envvar='TS_LEGALCHECK_SNAPSHOT', 
+              required=False, help='Compiled engine snapshot, (re)created from the definitions if missing or outdated')
+@_encodingOption
+@_explanationOptions
+@_budgetOptions
+@_cacheOptions
+@click.option('--jobs', '-j', 'jobs', type=int, default=1, required=False, help='Number of worker processes checking the components, 0 to use all CPUs')
+@click.option('--fast', 'fast', default=False, is_flag=True, envvar='TS_LEGALCHECK_FAST', required=False, 
+              help='Evaluate compiled decision tables, the solver is used only for the undecided licenses')
+@_profileOption
 @click.option('--verbose', 'verbose', default=False, is_flag=True, required=False, help='Enable verbose output')
 @click.argument('path', type=click.Path(exists=True, path_type=pathlib.Path), required=True)
-def check(defs, verbose, path):
+def check(defs, snapshot, encoding, explanation, incremental, solverStatistics, slicing, prepareUseCases, maxCores, explanationTimeout, 
+          checkTimeout, checkRlimit, moduleTimeout, moduleRlimit, cache, cacheSize, jobs, fast, profile, verbose, path):
+    from .engine.context import Module
+
+    # The decision tables are evaluated in the process, they are not distributed across workers
+    if fast and jobs != 1:
+        raise click.UsageError('--fast cannot be combined with --jobs')
+
+    # The components are checked by several workers, each of them would start the module budget anew
+    if jobs != 1 and (moduleTimeout or moduleRlimit):
+        raise click.UsageError('--module-timeout and --module-rlimit cannot be combined with --jobs')
+
     if verbose:
         setup_logging()
 
+    profile = _startProfile(profile)
+
     if mod := Module.load(path):
-        engine = _createEngine(list(defs))
+        engine = _createEngine(list(defs), snapshot, encoding, cache, cacheSize)
+        _configureEngine(engine, explanation, maxCores, explanationTimeout, incremental, solverStatistics, slicing, prepareUseCases,
+                         checkTimeout=checkTimeout, checkRlimit=checkRlimit, moduleTimeout=moduleTimeout, moduleRlimit=moduleRlimit)
 
-        result = engine.checkModule(mod)
+        if fast:
+            from .engine.tables import FastEngine
+            result = FastEngine(engine).checkModule(mod)
+        else:
+            result = engine.checkModule(mod, jobs=jobs)
         result = json.dumps(result, indent=2)
 
+        _closeEngine(engine)
+        _reportProfile(profile)
+
         print(result)
 
 
+@cli.command('check-batch')
+@click.option('--defs', '-d', 'defs', type=click.Path(exists=True, path_type=pathlib.Path), default=[],
+              multiple=True, required=False, help='File with constraints definitions')
+@click.option('--snapshot', '-s', 'snapshot', type=click.Path(dir_okay=False, path_type=pathlib.Path), envvar='TS_LEGALCHECK_SNAPSHOT', 
+              required=False, help='Compiled engine snapshot, (re)created from the definitions if missing or outdated')
+@_encodingOption
+@_explanationOptions
+@_budgetOptions
+@_cacheOptions
+@click.option('--jobs', '-j', 'jobs', type=int, default=1, required=False, help='Number of worker processes, 0 to use all CPUs')
+@click.option('--output', '-o', 'output', type=click.File('w'), default='-', required=False, help='File to write the report to')
+@click.option('--verbose', 'verbose', default=False, is_flag=True, required=False, help='Enable verbose output')
+@click.argument('pattern', type=str, required=True)
+def check_batch(defs, snapshot, encoding, explanation, incremental, solverStatistics, slicing, prepareUseCases, maxCores, explanationTimeout, 
+                checkTimeout, checkRlimit, moduleTimeout, moduleRlimit, cache, cacheSize, jobs, output, verbose, pattern):
+    """
+    Checks all module files in a directory or matching a glob pattern
+    """
+    from .engine.batch import findModules
+
+    if verbose:
+        setup_logging()
+
+    paths = findModules(pattern)
+    if not paths:
+        raise click.ClickException(f'No module files found: {pattern}')
+
+    engine = _createEngine(list(defs), snapshot, encoding, cache, cacheSize)
+    _configureEngine(engine, explanation, maxCores, explanationTimeout, incremental, solverStatistics, slicing, prepareUseCases,
+                     checkTimeout=checkTimeout, checkRlimit=checkRlimit, moduleTimeout=moduleTimeout, moduleRlimit=moduleRlimit)
+    
+    report = engine.checkModules(paths, jobs=jobs)
+    json.dump(report, output, indent=2)
+
+    _closeEngine(engine)
+
+
+
+@cli.command('check-sbom')
+@click.option('--defs', '-d', 'defs', type=click.Path(exists=True, path_type=pathlib.Path), default=[],
+              multiple=True, required=False, help='File with constraints definitions')
+@click.option('--snapshot', '-s', 'snapshot', type=click.Path(dir_okay=False, path_type=pathlib.Path), envvar='TS_LEGALCHECK_SNAPSHOT',
+              required=False, help='Compiled engine snapshot, (re)created from the definitions if missing or outdated')
+@_encodingOption
+@_explanationOptions
+@_budgetOptions
+@_cacheOptions
+@click.option('--use-case', '-u', 'useCase', type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path), required=False,
+              help='File with the module and component properties applied to all components')
+@click.option('--aliases', 'aliases', type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path), required=False,
+              help='File mapping license IDs of the SBOM to license keys')
+@click.option('--output', '-o', 'output', type=click.File('w'), default='-', required=False, help='File to write the results to')
+@click.option('--verbose', 'verbose', default=False, is_flag=True, required=False, help='Enable verbose output')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path), required=True)
+def check_sbom(defs, snapshot, encoding, explanation, incremental, solverStatistics, slicing, prepareUseCases, maxCores, explanationTimeout,
+               checkTimeout, checkRlimit, moduleTimeout, moduleRlimit, cache, cacheSize, useCase, aliases, output, verbose, path):
+    """
+    Checks the components of a CycloneDX or SPDX SBOM in the JSON format.
+    The components are read and checked one at a time, the results are written as JSON lines.
+    """
+    from .engine.context import Module
+    from .engine.sbom import LicenseMapper, SBOMError, readComponents
+    from .utils import load_file
+
+    if verbose:
+        setup_logging()
+
+    situation = (load_file(useCase) or {}) if useCase else {}
+    aliases = (load_file(aliases) or {}) if aliases else {}
+
+    mod = Module(path.stem, situation.get('module', {}))
+    try:
+        mod.validate()
+    except ValueError as err:
+        raise click.ClickException(str(err))
+
+    engine = _createEngine(list(defs), snapshot, encoding, cache, cacheSize)
+    _configureEngine(engine, explanation, maxCores, explanationTimeout, incremental, solverStatistics, slicing, prepareUseCases,
+                     checkTimeout=checkTimeout, checkRlimit=checkRlimit, moduleTimeout=moduleTimeout, moduleRlimit=moduleRlimit)
+
+    comps = readComponents(path, LicenseMapper(engine.licenses.keys(), aliases), situation.get('component', {}))
+
+    try:
+        for comp, result in engine.iterCheckModule(mod, comps):
+            output.write(json.dumps({'key': comp.key, 'licenses': list(comp.licenses), 'result': result}) + '\n')
+    except SBOMError as err:
+        raise click.ClickException(f'Cannot read {str(path)}: {err}')
+    finally:
+        _closeEngine(engine)
+
+
+
 @cli.command()
 @click.option('--defs', '-d', 'defs', type=click.Path(exists=True, path_type=pathlib.Path), default=(),
               multiple=True, required=False, help='File with constraints definitions')
+@click.option('--snapshot', '-s', 'snapshot', type=click.Path(dir_okay=False, path_type=pathlib.Path), envvar='TS_LEGALCHECK_SNAPSHOT', 
+              required=False, help='Compiled engine snapshot, (re)created from the definitions if missing or outdated')
+@_encodingOption
+@_explanationOptions
+@_budgetOptions
+@_cacheOptions
 @click.option('-l', '--license', 'lic', type=str, required=True, help='License key to test the input against')
+@_profileOption
 @click.option('--verbose', 'verbose', default=False, is_flag=True, required=False, help='Enable verbose output')
 @click.argument('path', type=click.Path(exists=True, path_type=pathlib.Path), required=True)
-def test(defs, lic, verbose, path):
+def test(defs, snapshot, encoding, explanation, incremental, solverStatistics, slicing, prepareUseCases, maxCores, explanationTimeout, 
+         checkTimeout, checkRlimit, moduleTimeout, moduleRlimit, cache, cacheSize, lic, profile, verbose, path):
     from .testing import test_license
     
     if verbose:
         setup_logging()
+
+    profile = _startProfile(profile)
     
-    engine = _createEngine(list(defs))
+    engine = _createEngine(list(defs), snapshot, encoding, cache, cacheSize)
+    _configureEngine(engine, explanation, maxCores, explanationTimeout, incremental, solverStatistics, slicing, prepareUseCases,
+                     checkTimeout=checkTimeout, checkRlimit=checkRlimit, moduleTimeout=moduleTimeout, moduleRlimit=moduleRlimit)
 
     if result := test_license(engine, lic, path):
         print(json.dumps(result.to_dict(), indent=2))
 
+    _closeEngine(engine)
+    _reportProfile(profile)
+
+
+
+@cli.command('profile-rules')
+@click.option('--defs', '-d', 'defs', type=click.Path(exists=True, path_type=pathlib.Path), default=[],
+              multiple=True, required=False, help='File with constraints definitions')
+@click.option('--snapshot', '-s', 'snapshot', type=click.Path(dir_okay=False, path_type=pathlib.Path), envvar='TS_LEGALCHECK_SNAPSHOT', 
+              required=False, help='Compiled engine snapshot, (re)created from the definitions if missing or outdated')
+@_encodingOption
+@click.option('--verbose', 'verbose', default=False, is_flag=True, required=False, help='Enable verbose output')
+@click.argument('path', type=click.Path(exists=True, path_type=pathlib.Path), required=True)
+def profile_rules(defs, snapshot, encoding, verbose, path):
+    """
+    Attributes the solver effort of checking a module to the rules
+    """
+    from .engine.context import Module
+
+    if verbose:
+        setup_logging()
+
+    if mod := Module.load(path):
+        engine = _createEngine(list(defs), snapshot, encoding)
+        print(json.dumps(engine.profileRules(mod), indent=2))
+
+
+
+@cli.command()
+@click.option('--defs', '-d', 'defs', type=click.Path(exists=True, path_type=pathlib.Path), default=(),
+              multiple=True, required=True, help='File with constraints definitions')
+@click.option('--output', '-o', 'output', type=click.Path(dir_okay=False, path_type=pathlib.Path), required=True, help='Snapshot file to write')
+@_encodingOption
+@click.option('--verbose', 'verbose', default=False, is_flag=True, required=False, help='Enable verbose output')
+def compile(defs, output, encoding, verbose):
+    """
+    Compiles the definitions into an engine snapshot
+    """
+    from .engine import createEngine
+
+    if verbose:
+        setup_logging()
+
+    engine = createEngine(list(defs), encoding=encoding or ENCODING_QUANTIFIED)
+    engine.save(output, roots=list(defs))
+
 
 
 @cli.command()
 @click.option('--port', '-p', 'port', type=int, default=5000, envvar='TS_LEGALCHECK_WEBUI_PORT', required=False, help='Port to run the web server on')
-def start(port):
+@click.option('--warmup', 'warmup', default=False, is_flag=True, envvar='TS_LEGALCHECK_POOL_WARMUP', required=False, help='Build the engines of all models on startup')
+@click.option('--watch', 'watch', default=False, is_flag=True, envvar='TS_LEGALCHECK_WATCH', required=False, 
+              help='Reload changed definitions in the background instead of on the next request')
+def start(port, warmup, watch):
     from .ui import run
-    run(port=port)
+    run(port=port, warmup=warmup, watch=watch)
 
 
 if __name__ == '__main__':
@@ -1,15 +1,36 @@
+import copy
+import json
+import contextlib
+import time
+import uuid
+import hashlib
 import logging
 import typing as t
 import glob
+import os
 
 import ts_legalcheck.utils as utils
 
 from pathlib import Path
 
+from . import snapshot, defcache
 from .marco import *
 from .context import Module, Component
+from .cache import ResultCache, resultKey
+from .blocks import Block, definitionBlocks
+from .slicing import RuleIndex
+from .prepared import PreparedUseCase, useCaseKey, MAX_USE_CASES
+from .budget import Budget, Limits, limits, NO_TIMEOUT, SCOPE_CHECK, SCOPE_MODULE, UNBOUNDED
+from .instrumentation import Instrumentation, TimingEvent, getInstrumentation
+from .instrumentation import PHASE_READ, PHASE_LOAD, PHASE_PARSE, PHASE_ASSERT, PHASE_PUSH, PHASE_POP, PHASE_CHECK, PHASE_EXPLAIN, PHASE_EXTRACT
 from .constraints import ConstraintsBuilder, Constraint, License, Rule
-from .constraints.parser import Parser
+from ..options import ENCODING_QUANTIFIED, ENCODING_GROUNDED, ENCODINGS, EXPLAIN_ALL, EXPLAIN_MUS, EXPLAIN_FIRST, EXPLANATIONS
+
+# Solver statistics, which are not accumulated over the checks
+SOLVER_GAUGES = ('memory', 'max memory', 'time')
+
+if t.TYPE_CHECKING:
+    from .constraints.parser import Parser
 
 
 logger = logging.getLogger('ts_legalcheck.engine')
@@ -22,26 +43,105 @@ class Engine(ConstraintsBuilder):
     """
     TS Engine
     """
-    def __init__(self, solver = None):
+    def __init__(self, solver = None, encoding: str = ENCODING_QUANTIFIED):
+        if encoding not in ENCODINGS:
+            raise EngineError(f'Unknown encoding: {encoding}')
+
         self.__solver = solver if solver else Solver()
+        self.__encoding = encoding
         
         super().__init__(ctx=self.__solver.ctx)
 
-        self.__parser = Parser(builder=self)
+        # Created on the first parsed constraint, engines loaded from snapshots do not need the parser
+        self.__parser: t.Optional['Parser'] = None
 
         self.__rules = {}
         self.__licenses = {}
         self.__obligations = {}
 
+        # Quantified facts, which are instantiated on demand in the grounded encoding
+        self.__templates: t.List[BoolRef] = []
+        self.__instances: t.Dict[t.Tuple[int, ...], t.List[t.Tuple[t.Optional[str], BoolRef]]] = {}
+
+        # Use-cases prepared for the grounded encoding by their module properties, in the order of their preparation
+        self.__useCases: t.Dict[str, PreparedUseCase] = {}
+
+        self.__sources: t.List[Path] = []
+
+        # Digests and asserted facts (or grounded templates) of the loaded blocks of definitions,
+        # which identify the facts to drop when the definitions are reloaded
+        self.__blocks: t.Dict[str, t.Tuple[str, t.List[BoolRef], t.Optional[Path]]] = {}
+        self.__collected: t.Optional[t.List[BoolRef]] = None
+
+        # Digest of the loaded definitions identifying the model
+        self.__digest = hashlib.sha256(encoding.encode()).hexdigest()
+        self.cache: t.Optional[ResultCache] = None
+
+        # Receives the timing events of the engine phases
+        self.instrumentation: t.Optional[Instrumentation] = getInstrumentation()
+
+        # Explanation of UNSAT checks, the number of cores and the time budget in seconds bound the MUS enumeration
+        self.explanation = EXPLAIN_ALL
+        self.maxCores: t.Optional[int] = None
+        self.explanationTimeout: t.Optional[float] = None
+
+        # Check results carry the statistics of the solver
+        self.solverStatistics = False
+
+        # Checks assume only the rules, which may affect the checked license, see RuleIndex. 
+        # The index is built on the first check, the rules of the current check are kept to filter the grounded facts
+        self.slicing = True
+        self.__index: t.Optional[RuleIndex] = None
+        self.__sliced: t.Optional[t.Set[str]] = None
+
+        # Pushed modules prepare their use-cases in the grounded encoding, see prepare
+        self.prepareUseCases = False
+
+        # Budgets of a license check, including the explanation of a violation, and of all checks of a module.
+        # The time is given in seconds, the resources as counted by the solver (rlimit)
+        self.checkTimeout: t.Optional[float] = None
+        self.checkRlimit: t.Optional[int] = None
+        self.moduleTimeout: t.Optional[float] = None
+        self.moduleRlimit: t.Optional[int] = None
+
+        # Budgets of the pushed modules and the limits currently set in the solver
+        self.__budgets: t.List[t.Optional[Budget]] = []
+        self.__limits = Limits()
+
+        # In the incremental mode the facts of pushed objects are guarded by indicator literals,
+        # which are assumed while in scope, instead of opening solver scopes
+        self.__incremental = False
+        self.__guards: t.Dict[t.Tuple[int, ...], t.Tuple[BoolRef, BoolRef, t.List[BoolRef]]] = {}
+        self.__guardsPrefix = f'!{uuid.uuid4().hex[:8]}.'
+        self.__scopes: t.List[t.Optional[t.List[BoolRef]]] = []
+
+        # Obligations of a component constant packed into a single bit-vector term, 
+        # the constant is kept alive as the key is its id
+        self.__obligationTerms: t.Dict[int, t.Tuple[ExprRef, ExprRef]] = {}
+
+        # License checks solved and saved by deduplicating equivalent components, 
+        # the time in seconds spent on extracting obligations from the models and the rules left out by slicing
+        self.__stats = {'checks': 0, 'saved': 0, 'extraction': 0.0, 'sliced': 0}
+
         self.__modsStack = []
+        self.__modsProps = []
+        self.__modsUseCases: t.List[t.Optional[PreparedUseCase]] = []
         self.__compsStack = []
+        self.__compsProps = []
         self.__licsStack = []
 
+        # Keys of the objects in scope identifying the timing events
+        self.__names: t.Dict[type, t.List[str]] = {Module: [], Component: [], License: []}
+
 
     @property
     def solver(self):
         return self.__solver
 
+    @property
+    def encoding(self) -> str:
+        return self.__encoding
+
     @property
     def rules(self):
         return self.__rules
@@ -50,17 +150,325 @@ class Engine(ConstraintsBuilder):
     def licenses(self):
         return self.__licenses
 
+    @property
+    def obligations(self) -> t.Dict[str, str]:
+        return self.__obligations
+
+    @property
+    def options(self) -> t.Dict[str, t.Any]:
+        """
+        Options of the checks, which are not part of the model
+        """
+        return {
+            'explanation': self.explanation,
+            'maxCores': self.maxCores,
+            'explanationTimeout': self.explanationTimeout,
+            'incremental': self.__incremental,
+            'solverStatistics': self.solverStatistics,
+            'slicing': self.slicing,
+            'prepareUseCases': self.prepareUseCases,
+            'checkTimeout': self.checkTimeout,
+            'checkRlimit': self.checkRlimit,
+            'moduleTimeout': self.moduleTimeout,
+            'moduleRlimit': self.moduleRlimit
+        }
+
+    def configure(self, 
+                  explanation: t.Optional[str] = None, 
+                  maxCores: t.Optional[int] = None, 
+                  explanationTimeout: t.Optional[float] = None,
+                  incremental: t.Optional[bool] = None,
+                  solverStatistics: t.Optional[bool] = None,
+                  slicing: t.Optional[bool] = None,
+                  prepareUseCases: t.Optional[bool] = None,
+                  checkTimeout: t.Optional[float] = None,
+                  checkRlimit: t.Optional[int] = None,
+                  moduleTimeout: t.Optional[float] = None,
+                  moduleRlimit: t.Optional[int] = None):
+        if incremental is not None and incremental != self.__incremental:
+            if self.__scopes:
+                raise EngineError('Checking mode cannot be changed while objects are pushed')
+
+            self.__incremental = incremental
+
+        if explanation is not None:
+            if explanation not in EXPLANATIONS:
+                raise EngineError(f'Unknown explanation: {explanation}')
+            
+            self.explanation = explanation
+
+        if solverStatistics is not None:
+            self.solverStatistics = solverStatistics
+
+        if slicing is not None:
+            self.slicing = slicing
+
+        if prepareUseCases is not None:
+            self.prepareUseCases = prepareUseCases
+
+            if prepareUseCases and (self.__encoding != ENCODING_GROUNDED or self.__incremental):
+                logger.warning('Use-cases are only prepared in the grounded encoding without incremental checks')
+
+        # Bounds and budgets, which are not given, are kept, UNBOUNDED removes them
+        def bound(value: t.Any, current: t.Any) -> t.Any:
+            return current if value is None else (None if value is UNBOUNDED else value)
+
+        self.maxCores = bound(maxCores, self.maxCores)
+        self.explanationTimeout = bound(explanationTimeout, self.explanationTimeout)
+
+        self.checkTimeout = bound(checkTimeout, self.checkTimeout)
+        self.checkRlimit = bound(checkRlimit, self.checkRlimit)
+        self.moduleTimeout = bound(moduleTimeout, self.moduleTimeout)
+        self.moduleRlimit = bound(moduleRlimit, self.moduleRlimit)
+
+    @property
+    def statistics(self) -> t.Dict[str, t.Any]:
+        return self.__stats
+
+    @property
+    def digest(self) -> str:
+        return self.__digest
+
+    @property
+    def sources(self) -> t.List[Path]:
+        """
+        Definition files the engine facts were loaded from
+        """
+        return self.__sources
+
+    @property
+    def blocks(self) -> t.Dict[str, t.Optional[Path]]:
+        """
+        Definition files of the loaded blocks of definitions by their keys, see definitionBlocks()
+        """
+        return {k: source for k, (_, _, source) in self.__blocks.items()}
+
 
     # Solver utils
-    def __eval(self, cnstr):
-        return is_true(self.__solver.model().eval(cnstr, model_completion=True))
+    def __scope(self) -> t.Tuple[t.Optional[str], ...]:
+        return tuple(names[-1] if names else None for names in self.__names.values())
+
+    @contextlib.contextmanager
+    def __measure(self, phase: str, before: bool = False):
+        """
+        Emits the timing event of the phase identified by the objects in scope at its end or, if before is set, at its start.
+        """
+        if self.instrumentation is None:
+            yield
+            return
+
+        scope = self.__scope() if before else None
+        start = time.perf_counter()
+
+        yield
+
+        duration = time.perf_counter() - start
+        self.instrumentation.emit(TimingEvent(phase, duration, *(scope or self.__scope())))
+
+    def __extractObligations(self, extended_results: bool) -> t.List[str]:
+        """
+        Evaluates the obligations of the component in scope at once in the model of the solver. 
+        The obligation i holds if the bit i of the evaluated term is set.
+        """
+        if len(self.__compsStack) == 0 or len(self.__obligations) == 0:
+            return []
+
+        start = time.perf_counter()
+
+        c_const = self.__compsStack[len(self.__compsStack) - 1]
+        if (entry := self.__obligationTerms.get(c_const.get_id())) is None:
+            bits = [If(self.makeComponentCnstrExpr(k, c_const), BitVecVal(1, 1, self.context), BitVecVal(0, 1, self.context)) 
+                    for k in reversed(self.__obligations.keys())]
+            entry = (c_const, Concat(*bits) if len(bits) > 1 else bits[0])
+            self.__obligationTerms[c_const.get_id()] = entry
+
+        value = t.cast(BitVecNumRef, self.__solver.model().eval(entry[1], model_completion=True)).as_long()
+
+        obligations = []
+        for i, (_key, _name) in enumerate(self.__obligations.items()):
+            if value >> i & 1:
+                name = f"{_name if _name else 'Unknown'} ({_key})" if extended_results else _key
+                obligations.append(name)
+
+        duration = time.perf_counter() - start
+        self.__stats['extraction'] += duration
+
+        if self.instrumentation is not None:
+            self.instrumentation.emit(TimingEvent(PHASE_EXTRACT, duration, *self.__scope()))
+
+        return obligations
 
     def __addFact(self, fact, tag:t.Optional[str]=None):
         if tag:
             fact = Implies(Bool(tag, self.context), fact)
         
-        self.__solver.add(fact)
+        with self.__measure(PHASE_ASSERT):
+            self.__solver.add(fact)
 
+        if self.__collected is not None:
+            self.__collected.append(fact)
+
+    def __addForAll(self, consts: t.List[ExprRef], fact, tag:t.Optional[str]=None):
+        if self.__encoding == ENCODING_GROUNDED:
+            fact = ForAll(consts, fact)
+            self.__templates.append(Implies(Bool(tag, self.context), fact) if tag else fact)
+
+            if self.__collected is not None:
+                self.__collected.append(self.__templates[-1])
+        else:
+            self.__addFact(ForAll(consts, fact), tag)
+
+    def __guard(self, facts: t.List[BoolRef]) -> BoolRef:
+        """
+        Returns the indicator literal implying the facts. The literals are named uniquely per engine, 
+        so that they do not clash with literals of other engines in snapshots of the solver.
+        """
+        key = tuple(f.get_id() for f in facts)
+
+        if (guard := self.__guards.get(key)) is None:
+            g = Bool(f'{self.__guardsPrefix}{len(self.__guards)}', self.context)
+            guard = (g, Not(g), facts)
+
+            self.__solver.add([Implies(g, f) for f in facts])
+            self.__guards[key] = guard
+
+        return guard[0]
+
+    def __active(self) -> t.List[BoolRef]:
+        """
+        Indicator literals of the objects in scope together with the negated literals of the objects 
+        out of scope, which keeps the solver from deciding their facts
+        """
+        active = {g.get_id(): g for scope in self.__scopes if scope for g in scope}
+        return list(active.values()) + [n for g, n, _ in self.__guards.values() if g.get_id() not in active]
+
+    def __splitTag(self, fact: BoolRef) -> t.Tuple[t.Optional[BoolRef], BoolRef]:
+        if is_implies(fact) and is_const(fact.arg(0)) and fact.arg(0).decl().name() in self.__rules:
+            return fact.arg(0), fact.arg(1)
+        
+        return None, fact
+
+    @staticmethod
+    def __ground(fact: BoolRef, consts: t.Dict[str, ExprRef]) -> t.Optional[BoolRef]:
+        if not is_quantifier(fact):
+            return fact
+
+        q = t.cast(QuantifierRef, fact)
+        n = q.num_vars()
+
+        # The last bound variable has the de Bruijn index 0
+        sorts = [q.var_sort(i).name() for i in reversed(range(n))]
+        if any(s not in consts for s in sorts):
+            return None
+
+        return t.cast(BoolRef, substitute_vars(q.body(), *[consts[s] for s in sorts]))
+
+    def __instantiate(self, consts: t.Dict[str, ExprRef]) -> t.List[t.Tuple[t.Optional[str], BoolRef]]:
+        """
+        Instantiates the quantified facts for the given constants of the Module, Component and License sorts,
+        each one together with the key of the rule it belongs to (None for untagged facts).
+        Facts quantified over a sort without a constant are omitted, as they are satisfied trivially.
+        """
+        key = tuple(c.get_id() for c in consts.values())
+        if (facts := self.__instances.get(key)) is not None:
+            return facts
+
+        facts = []
+        for fact in self.__templates:
+            tag, fact = self.__splitTag(fact)
+            if (inst := Engine.__ground(fact, consts)) is not None:
+                facts.append((tag.decl().name(), Implies(tag, inst)) if tag is not None else (None, inst))
+
+        self.__instances[key] = facts
+        return facts
+
+    def __ruleIndex(self) -> RuleIndex:
+        """
+        Returns the index of the rules grounded for the module and component constants used by the checks
+        """
+        if self.__index is None:
+            consts = {
+                'Module': self.types.Module.mkModule(0),
+                'Component': self.types.Component.mkComponent(0),
+                'License': self.makeLicenseConst('l')
+            }
+
+            rules: t.Dict[str, t.List[BoolRef]] = {}
+            facts: t.List[BoolRef] = []
+
+            # Only the quantified facts refer to the checked license
+            for fact in list(self.__solver.assertions()) + self.__templates:
+                tag, fact = self.__splitTag(fact)
+                if is_quantifier(fact) and (inst := Engine.__ground(fact, consts)) is not None:
+                    if tag is not None:
+                        rules.setdefault(tag.decl().name(), []).append(inst)
+                    else:
+                        facts.append(inst)
+
+            self.__index = RuleIndex(rules, facts, self.types, self.constraints, consts)
+
+        return self.__index
+
+    def __slice(self, lic: License) -> t.Set[str]:
+        """
+        Returns the keys of the rules, which may affect the license for the properties of the module and the component in scope
+        """
+        if not self.slicing:
+            return set(self.__rules.keys())
+
+        index = self.__ruleIndex()
+        modProps = self.__modsProps[-1] if self.__modsProps else {}
+        compProps = self.__compsProps[-1] if self.__compsProps else {}
+
+        return {k for k in self.__rules.keys() if index.relevant(k, lic.key, modProps, compProps)}
+
+    def prepare(self, properties: t.Dict[str, t.Any]) -> PreparedUseCase:
+        """
+        Prepares the use-case given by the module properties. The properties, and those of the checked components,
+        are substituted into the facts instantiated for the later checks of modules with the same properties, see PreparedUseCase.
+        Prepared use-cases take effect in the grounded encoding, unless the checks are incremental.
+        """
+        key = useCaseKey(properties)
+
+        if (useCase := self.__useCases.pop(key, None)) is None:
+            m_const = self.types.Module.mkModule(0)
+            c_const = self.types.Component.mkComponent(0)
+            useCase = PreparedUseCase(properties, 
+                                      [(self.makeModuleCnstrExpr(k, m_const), BoolVal(v, self.context)) for k, v in properties.items()],
+                                      lambda k, v: (self.makeComponentCnstrExpr(k, c_const), BoolVal(v, self.context)))
+
+            if len(self.__useCases) >= MAX_USE_CASES:
+                self.__useCases.pop(next(iter(self.__useCases)))
+
+        self.__useCases[key] = useCase
+        return useCase
+
+    def groundFacts(self, lic: License) -> t.List[t.Tuple[t.Optional[str], BoolRef]]:
+        """
+        Returns the facts instantiated for the license and the module and component constants used by the checks,
+        each one together with the key of the rule it belongs to (None for untagged facts).
+        """
+        consts = {
+            'Module': self.types.Module.mkModule(0),
+            'Component': self.types.Component.mkComponent(0),
+            'License': lic.const(self.types)
+        }
+
+        facts = []
+        for fact in list(self.__solver.assertions()) + self.__templates:
+            tag, fact = self.__splitTag(fact)
+            if (inst := Engine.__ground(fact, consts)) is not None:
+                facts.append((tag.decl().name() if tag is not None else None, inst))
+
+        return facts
+
+    def __parse(self, cnstr: str) -> BoolRef:
+        if self.__parser is None:
+            from .constraints.parser import Parser
+            self.__parser = Parser(builder=self)
+
+        with self.__measure(PHASE_PARSE):
+            return self.__parser.parse_cnstr(cnstr)
 
     def __makeCnstrFromObject(self, obj: dict, key: str) -> t.Optional[BoolRef]:
         value = obj.get(key)
@@ -69,11 +477,11 @@ class Engine(ConstraintsBuilder):
 
         if type(value) is str:
             """ Parses a single string value as a constraint"""
-            return self.__parser.parse_cnstr(value)
+            return self.__parse(value)
         
         elif type(value) is list and all(type(item) is list for item in value):            
             """ Parses a list of lists as a CNF constraint"""            
-            clauses = [Or([self.__parser.parse_cnstr(c) for c in clauses], self.context) 
+            clauses = [Or([self.__parse(c) for c in clauses], self.context) 
                        for clauses in value if len(clauses) > 0]
 
             if len(clauses) > 0:
@@ -88,21 +496,123 @@ class Engine(ConstraintsBuilder):
     
     # Fork
 
-    def fork(self):
+    def fork(self, exclude: t.Iterable[str] = ()):
+        """
+        Returns a copy of the engine in a new context. The facts of the excluded blocks of definitions are dropped 
+        together with the facts of the incremental mode, which may contain instances of them.
+        """
+        dropped = set()
+        if exclude := set(exclude):
+            kept = {f.get_id() for k, b in self.__blocks.items() if k not in exclude for f in b[1]}
+            dropped = {f.get_id() for k in exclude if k in self.__blocks for f in self.__blocks[k][1]} - kept
+            dropped.update(Implies(g, f).get_id() for g, _, facts in self.__guards.values() for f in facts)
+
         ctx = Context()
         solver = Solver(ctx=ctx)
-        solver.add([a.translate(ctx) for a in self.__solver.assertions()])  # type: ignore
 
-        newInst = Engine(solver=solver)        
+        translated = {a.get_id(): a.translate(ctx) for a in self.__solver.assertions() if a.get_id() not in dropped}  # type: ignore
+        solver.add(list(translated.values()))
+
+        newInst = Engine(solver=solver, encoding=self.__encoding)
+        templates = [f for f in self.__templates if f.get_id() not in dropped]
+        newInst.__templates = [f.translate(ctx) for f in templates]
+        translated.update((f.get_id(), g) for f, g in zip(templates, newInst.__templates))
+
+        newInst.__blocks = {k: (d, [translated[f.get_id()] for f in facts], source) 
+                            for k, (d, facts, source) in self.__blocks.items() if k not in exclude}
         
         newInst.__rules = self.__rules
         newInst.__licenses = self.__licenses        
         newInst.__obligations = self.__obligations
-        newInst.__constraints = self.__constraints
+        newInst.__sources = self.__sources
+        newInst.__digest = self.__digest
+        newInst.cache = self.cache
+        newInst.instrumentation = self.instrumentation
+        newInst.configure(**self.options)
+
+        # Guarded facts are part of the translated assertions
+        newInst.__guardsPrefix = self.__guardsPrefix
+        for g, n, facts in (self.__guards.values() if not exclude else []):
+            facts = [f.translate(ctx) for f in facts]
+            newInst.__guards[tuple(f.get_id() for f in facts)] = (g.translate(ctx), n.translate(ctx), facts)
+        newInst.constraints.update(self.constraints)
 
         return newInst
 
 
+    # Snapshots
+
+    def toSnapshot(self) -> t.Dict[str, t.Any]:
+        """
+        Returns the solver assertions together with the rules, licenses and obligations tables.
+        The result can be used to create an engine without parsing the definitions.
+        """
+        return {
+            'sources': [snapshot.fingerprint(p) for p in self.__sources],
+            'directories': snapshot.directories(self.__sources),
+            'constraints': {k: c.constKey for k, c in self.constraints.items()},
+            'licenses': {k: l.constKey for k, l in self.__licenses.items()},
+            'rules': {k: r.type for k, r in self.__rules.items()},
+            'obligations': self.__obligations,
+            'encoding': self.__encoding,
+            'digest': self.__digest,
+            'assertions': snapshot.toSMT2(self.__solver.assertions()),  # type: ignore
+            'templates': snapshot.toSMT2(self.__templates)
+        }
+
+
+    @staticmethod
+    def fromSnapshot(data: t.Dict[str, t.Any]) -> 'Engine':
+        engine = Engine(solver = Solver(ctx = Context()), encoding = data.get('encoding', ENCODING_QUANTIFIED))
+
+        engine.constraints.update({k: Constraint(k, constKey=v) for k, v in data['constraints'].items()})
+        engine.__licenses = {k: License(k, constKey=v) for k, v in data['licenses'].items()}
+        engine.__rules = {k: Rule(k, v) for k, v in data['rules'].items()}
+        engine.__obligations = data['obligations']
+        engine.__sources = [Path(fp['path']) for fp in data['sources']]
+        engine.__digest = data.get('digest') or hashlib.sha256((data['assertions'] + data.get('templates', '')).encode()).hexdigest()
+
+        dt = engine.types
+        sorts = {s.name(): s for s in (dt.Module, dt.Component, dt.License, dt.Constraint)}
+
+        engine.__solver.add(parse_smt2_string(data['assertions'], sorts=sorts, ctx=engine.context))
+
+        if data.get('templates'):
+            engine.__templates = list(parse_smt2_string(data['templates'], sorts=sorts, ctx=engine.context))
+
+        return engine
+
+
+    def save(self, path: Path, roots: t.Optional[t.Iterable[Path]] = None):
+        """
+        Writes the engine snapshot into a file.
+        """
+        data = self.toSnapshot()
+        data['roots'] = [str(p.resolve()) for p in roots] if roots else []
+
+        snapshot.write(path, data)
+
+
+    @staticmethod
+    def loadSnapshot(path: Path, validate: bool = True, encoding: t.Optional[str] = None) -> t.Optional['Engine']:
+        """
+        Creates an engine from a snapshot file. 
+        Returns None if the snapshot is outdated, incompatible or uses another encoding than requested.
+        """
+        data = snapshot.read(path, validate=validate)
+        if data is None:
+            return None
+
+        if encoding and data.get('encoding', ENCODING_QUANTIFIED) != encoding:
+            logger.info(f'Snapshot {str(path)} uses another encoding')
+            return None
+
+        engine = Engine.fromSnapshot(data)
+
+        logger.info(f'ts-legalcheck engine loaded from snapshot {str(path)}')
+        return engine
+
+
     # Loading and initialization of facts from the data set
 
     def loadConstraints(self, constraints: dict):
@@ -130,13 +640,13 @@ class Engine(ConstraintsBuilder):
             cCnstr = self.makeComponentCnstrExpr(k)
             lCnstr = self.makeLicenseCnstrExpr(k)
 
-            self.__addFact(ForAll([l, c], Implies(self.types.ComponentLicense(c, l), cCnstr == lCnstr)))
+            self.__addForAll([l, c], Implies(self.types.ComponentLicense(c, l), cCnstr == lCnstr))
 
         for k, _ in constraints.get('Terms', {}).items():
             cCnstr = self.makeComponentCnstrExpr(k)
             lCnstr = self.makeLicenseCnstrExpr(k)
 
-            self.__addFact(ForAll([l, c], Implies(self.types.ComponentLicense(c, l), cCnstr == lCnstr)))
+            self.__addForAll([l, c], Implies(self.types.ComponentLicense(c, l), cCnstr == lCnstr))
 
         # An obligation holds for a component IFF.
         # the obligation condition (distribution form, modification, etc.) is satisfied AND
@@ -182,7 +692,7 @@ class Engine(ConstraintsBuilder):
 
                     impl = (cCnstr == And(sCnstr, vCnstr, self.context))
 
-                    self.__addFact(ForAll([l, c], Implies(self.types.ComponentLicense(c, l), impl)))
+                    self.__addForAll([l, c], Implies(self.types.ComponentLicense(c, l), impl))
             else:
                 sCnstr = [__makeSettingCnstr(o)]
                 vCnstr = [__makeValueCnstr(o)] if 'value' in o else []
@@ -195,7 +705,7 @@ class Engine(ConstraintsBuilder):
                 
                 impl = (cCnstr == And(sCnstr, vCnstr, self.context))                    
 
-                self.__addFact(ForAll([l, c], Implies(self.types.ComponentLicense(c, l), impl)))
+                self.__addForAll([l, c], Implies(self.types.ComponentLicense(c, l), impl))
 
 
 
@@ -233,7 +743,7 @@ class Engine(ConstraintsBuilder):
                 fact = And(cond, setting, self.context)
 
 
-            self.__addFact(ForAll([m, c, l], fact), ruleId)
+            self.__addForAll([m, c, l], fact, ruleId)
 
 
 
@@ -267,147 +777,599 @@ class Engine(ConstraintsBuilder):
                     self.__addFact(f)
 
 
-    def load(self, constraints: dict):
-        self.loadLicenses(constraints)
-        self.loadConstraints(constraints)
-        self.loadRules(constraints)
+    def load(self, constraints: dict, files: t.Optional[t.List[t.Tuple[Path, t.Dict[str, t.Any]]]] = None):
+        """
+        Loads the definitions block by block, see definitionBlocks(). 
+        The files the definitions were merged from, if given, are recorded as the sources of the blocks.
+        """
+        data = json.dumps(constraints, sort_keys=True, default=str)
+        self.__digest = hashlib.sha256((self.__digest + data).encode()).hexdigest()
+
+        blocks = definitionBlocks(files if files is not None else [(None, constraints)])
+
+        with self.__measure(PHASE_LOAD):
+            self.__loadBlocks(blocks, constraints.get('Variants', {}))
+
+    def __loadBlocks(self, blocks: t.Dict[str, Block], variants: t.Dict[str, t.Any]):
+        self.__index = None
+        self.__useCases.clear()
+
+        try:
+            for key, block in blocks.items():
+                # The digest is computed upfront, as loading adds the missing variants to the obligations
+                digest = block.digest(variants)
+                self.__collected = []
+
+                if block.section == 'Constraints':
+                    self.loadLicenses({'Constraints': {block.name: block.data}})
+                elif block.section == 'Rules':
+                    self.loadRules({'Rules': [block.data]})
+                else:
+                    self.loadConstraints({block.section: {block.name: block.data}, 'Variants': variants})
+
+                self.__blocks[key] = (digest, self.__collected, block.source)
+        finally:
+            self.__collected = None
+
+    def reload(self, files: t.List[t.Tuple[Path, t.Dict[str, t.Any]]]) -> 'Engine':
+        """
+        Returns a new engine with the definitions of the files. Blocks of definitions, i.e. licenses, rights, terms, 
+        obligations and rules, which did not change are taken over from this engine, only the changed blocks 
+        are parsed and asserted. This engine is left intact, so that running checks can use it until the new one is swapped in.
+        """
+        if self.__scopes:
+            raise EngineError('Definitions cannot be reloaded while objects are pushed')
+
+        defs = mergeDefinitions(files)
+
+        if not self.__blocks:
+            # The facts of engines loaded from snapshots are not attributed to blocks
+            engine = createEngineWithDefinitions(defs, encoding=self.__encoding, files=files)
+            engine.cache = self.cache
+            engine.instrumentation = self.instrumentation
+            engine.configure(**self.options)
+        
+        else:
+            variants = defs.get('Variants', {})
+            blocks = definitionBlocks(files)
+            digests = {k: b.digest(variants) for k, b in blocks.items()}
+
+            stale = {k for k, b in self.__blocks.items() if digests.get(k) != b[0]}
+            changed = {k: b for k, b in blocks.items() if k not in self.__blocks or k in stale}
+
+            # The tables are shared by forks, so the loaded blocks are added to copies
+            engine = self.fork(exclude=stale)
+            engine.__licenses = {k: l for k, l in self.__licenses.items() if f'Constraints/{k}' not in stale}
+            engine.__rules = dict(self.__rules)
+            engine.__obligations = dict(self.__obligations)
+
+            data = json.dumps(defs, sort_keys=True, default=str)
+            engine.__digest = hashlib.sha256((hashlib.sha256(self.__encoding.encode()).hexdigest() + data).encode()).hexdigest()
+
+            with engine.__measure(PHASE_LOAD):
+                engine.__loadBlocks(changed, variants)
+
+            for key, block in changed.items():
+                logger.debug(f'Definitions {key} reloaded from {block.source}')
+
+            logger.info(f'{len(changed)} of {len(blocks)} definition blocks reloaded, {len(stale - set(blocks))} removed')
+
+        # The tables follow the order of the definitions as if the engine was built from scratch
+        engine.__licenses = {k: engine.__licenses[k] for k in defs.get('Constraints', {}) if k in engine.__licenses}
+        engine.__rules = {r['key']: Rule(r['key'], r.get('type', '')) for r in defs.get('Rules', []) if r.get('key')}
+        engine.__obligations = {k: o.get('name', '') for k, o in defs.get('Obligations', {}).items()}
+        engine.__sources = [p for p, _ in files]
+
+        return engine
 
 
     def push(self, el: Module|Component|License):
-        solver = self.__solver
-        solver.push()
+        with self.__measure(PHASE_PUSH):
+            self.__push(el)
+
+    def __push(self, el: Module|Component|License):
+        facts: t.List[t.List[BoolRef]] = []
 
         if isinstance(el, Module):
-            m_const = self.types.Module.make(0)
-            m_cnstr = [self.makeModuleCnstrExpr(key, m_const) == val for key, val in el.properties.items()]
+            m_const = self.types.Module.mkModule(0)
+            facts.extend([self.makeModuleCnstrExpr(key, m_const) == val] for key, val in el.properties.items())
 
-            solver.add(m_cnstr)
             self.__modsStack.append(m_const)
+            self.__modsProps.append(el.properties)
+            # Reduced facts are asserted in solver scopes only, guarding them would accumulate guards per use-case
+            useCase = None
+            if self.__templates and not self.__incremental:
+                useCase = self.prepare(el.properties) if self.prepareUseCases else self.__useCases.get(useCaseKey(el.properties))
+            self.__modsUseCases.append(useCase)
+            self.__names[Module].append(el.key)
+            self.__budgets.append(Budget.start(SCOPE_MODULE, self.moduleTimeout, self.moduleRlimit, self.__rlimitCount))
 
         elif isinstance(el, Component):
-            c_const = self.types.Component.make(0)
-            c_cnstr = [self.makeComponentCnstrExpr(key, c_const) == val for key, val in el.properties.items()]
+            c_const = self.types.Component.mkComponent(0)
+            facts.extend([self.makeComponentCnstrExpr(key, c_const) == val] for key, val in el.properties.items())
+            self.__compsProps.append(el.properties)
 
-            solver.add(c_cnstr)
             if len(self.__modsStack) > 0:
                 m_const = self.__modsStack[len(self.__modsStack) - 1]
-                solver.add(self.types.ModuleComponent(m_const, c_const))
+                facts.append([self.types.ModuleComponent(m_const, c_const)])
             self.__compsStack.append(c_const)
+            self.__names[Component].append(el.key)
 
         elif isinstance(el, License):
             if len(self.__compsStack) > 0:
                 c_const = self.__compsStack[len(self.__compsStack) - 1]
                 l_const = el.const(self.types)
-                solver.add(self.types.ComponentLicense(c_const, l_const))
+                l_facts = [self.types.ComponentLicense(c_const, l_const)]
                 self.__licsStack.append(l_const)
+                self.__names[License].append(el.key)
+
+                if self.__templates:
+                    consts = {'Component': c_const, 'License': l_const}
+                    if len(self.__modsStack) > 0:
+                        consts['Module'] = self.__modsStack[len(self.__modsStack) - 1]
+
+                    sliced = self.__sliced
+                    instances = [f for tag, f in self.__instantiate(consts) if tag is None or sliced is None or tag in sliced]
+
+                    # The facts of a prepared use-case are reduced by the module and component properties
+                    if self.__modsUseCases and (useCase := self.__modsUseCases[-1]) is not None:
+                        key = (tuple(c.get_id() for c in consts.values()), tuple(sorted(sliced)) if sliced is not None else None)
+                        instances = useCase.reduce(key, instances, self.__compsProps[-1] if self.__compsProps else None)
+
+                    l_facts.extend(instances)
+
+                facts.append(l_facts)
+
+        with self.__measure(PHASE_ASSERT):
+            if self.__incremental:
+                self.__scopes.append([self.__guard([f for group in facts for f in group])])
+            else:
+                self.__scopes.append(None)
+                self.__solver.push()
+                self.__solver.add([f for group in facts for f in group])
 
 
     def pop(self, ty: t.Type[Module|Component|License]):
+        with self.__measure(PHASE_POP, before=True):
+            self.__pop(ty)
+
+    def __pop(self, ty: t.Type[Module|Component|License]):
         stack = None
 
         if ty == Module:
             stack = self.__modsStack
+            self.__modsProps.pop()
+            self.__modsUseCases.pop()
+            self.__budgets.pop()
         elif ty == Component:
             stack = self.__compsStack
+            self.__compsProps.pop()
         elif ty == License:
             stack = self.__licsStack
 
         if stack is not None:
             stack.pop()
-            self.__solver.pop()
+            self.__names[ty].pop()
+            if self.__scopes.pop() is None:
+                self.__solver.pop()
+
+
+    def __solverCounters(self) -> t.Dict[str, float]:
+        stats = self.__solver.statistics()
+        return {k: stats.get_key_value(k) for k in stats.keys()}
+
+    def __check(self, assumptions: t.List[BoolRef]) -> t.Tuple[CheckSatResult, t.Dict[str, float]]:
+        """
+        Checks the assumptions and returns the solver statistics of the check. 
+        The counters of the solver are accumulated, so the counters before the check are subtracted.
+        """
+        before = self.__solverCounters()
+
+        with self.__measure(PHASE_CHECK):
+            status = self.__solver.check(assumptions)
+
+        stats = {k: v if k in SOLVER_GAUGES else v - before.get(k, 0) for k, v in self.__solverCounters().items()}
+        return status, stats
+
+    def __rlimitCount(self) -> float:
+        stats = self.__solver.statistics()
+        return stats.get_key_value('rlimit count') if 'rlimit count' in stats.keys() else 0
+
+    def __limit(self, budgets: t.List[Budget]):
+        """
+        Limits the time and resources of the next solver checks to the smallest budget left.
+        Raises UnknownResult if a budget is exhausted.
+        """
+        if not budgets and self.__limits == Limits():
+            return
+
+        self.__limits = limits(budgets, self.__rlimitCount)
+
+        timeout, rlimit = self.__limits.timeout, self.__limits.rlimit
+        self.__solver.set('timeout', max(1, int(timeout * 1000)) if timeout is not None else NO_TIMEOUT)
+        self.__solver.set('rlimit', int(rlimit) if rlimit is not None else 0)
+
+    def __reason(self, err: UnknownResult) -> str:
+        """
+        Reason of an UNKNOWN result, the reasons reported by the solver are attributed to the budgets limiting the check
+        """
+        reason = str(err)
+        if reason.endswith('budget exceeded'):
+            return reason
+
+        # Checks interrupted by the timer are reported as canceled, too
+        if reason in ('canceled', 'max. resource limit exceeded') and self.__limits.rlimitScope:
+            return f'{self.__limits.rlimitScope} resource budget exceeded'
+        if reason in ('timeout', 'canceled') and self.__limits.timeoutScope:
+            return f'{self.__limits.timeoutScope} time budget exceeded'
+
+        return f'Solver returned unknown: {reason}'
+
+    def __solve(self, assumptions: t.List[BoolRef], budgets: t.List[Budget], statistics: bool = False) -> t.Tuple[CheckSatResult, t.Optional[t.Dict[str, float]]]:
+        """
+        Checks the assumptions within the budgets. Raises UnknownResult if the solver cannot decide them.
+        """
+        self.__limit(budgets)
+
+        if statistics:
+            status, stats = self.__check(assumptions)
+        else:
+            with self.__measure(PHASE_CHECK):
+                status, stats = self.__solver.check(assumptions), None
 
+        if status == unknown:
+            raise UnknownResult(self.__solver.reason_unknown())
+
+        return status, stats
 
     def checkLicense(self, lic: License, extended_results: bool = True):
-        self.push(lic)
+        self.__stats['checks'] += 1
 
-        def extractObligations():
-            obligations = []
-            if len(self.__compsStack) > 0:
-                c_const = self.__compsStack[len(self.__compsStack) - 1]
-                for _key, _name in self.__obligations.items():
-                    if self.__eval(self.makeComponentCnstrExpr(_key, c_const)):
-                        name = f"{_name if _name else 'Unknown'} ({_key})" if extended_results else _key
-                        obligations.append(name)
+        sliced = self.__slice(lic)
+        self.__stats['sliced'] += len(self.__rules) - len(sliced)
 
-            return obligations
+        # The grounded facts of the rules out of the slice are not asserted. In the incremental mode the facts 
+        # are kept, as guarding the facts of every slice would accumulate guards in the solver
+        self.__sliced = sliced if not self.__incremental else None
+        try:
+            self.push(lic)
+        finally:
+            self.__sliced = None
 
+        # The rules out of the slice are disabled, so that the solver does not instantiate their facts
         solver = self.__solver
-        assumptions = [Bool(key, solver.ctx) for key in self.__rules.keys()]
+        active = self.__active() + [Not(Bool(key, solver.ctx)) for key in self.__rules.keys() if key not in sliced]
+        rules = [key for key in self.__rules.keys() if key in sliced]
+        assumptions = [Bool(key, solver.ctx) for key in rules]
 
-        if solver.check(assumptions) == sat:
-            logging.info(f'License {lic.key} is SAT')
+        budgets = [b for b in self.__budgets if b is not None]
+        if budget := Budget.start(SCOPE_CHECK, self.checkTimeout, self.checkRlimit, self.__rlimitCount):
+            budgets.append(budget)
+
+        try:
+            status, stats = self.__solve(assumptions + active, budgets, statistics=self.solverStatistics)
+
+        except UnknownResult as err:
+            logging.info(f'License {lic.key} is UNKNOWN')
             result = {
-                'status': 'SAT',
-                'obligations': extractObligations()
+                'status': 'UNKNOWN',
+                'reason': self.__reason(err)
             }
 
         else:
-            logging.info(f'License {lic.key} is UNSAT')
+            if status == sat:
+                logging.info(f'License {lic.key} is SAT')
+                result = {
+                    'status': 'SAT',
+                    'obligations': self.__extractObligations(extended_results)
+                }
 
-            c_solver = SubsetSolver(assumptions, solver)
-            m_solver = MapSolver(n=c_solver.n)
-            sets = enumerate_sets(c_solver, m_solver)
+            else:
+                logging.info(f'License {lic.key} is UNSAT')
 
-            violations = []
-            for orig, tags in sets:
-                if orig == 'MUS':
-                    for tag in tags:
-                        tn = tag.decl().name()
-                        violations.append(self.__rules[tn].key)            
+                with self.__measure(PHASE_EXPLAIN):
+                    violations, complete, reason = self.__explain(assumptions, active, budgets)
 
-            result = {
-                'status': 'UNSAT',
-                'rules': violations
-            }
+                result = {
+                    'status': 'UNSAT',
+                    'rules': violations,
+                    'explanation': 'complete' if complete else 'truncated'
+                }
 
-            # Disable violated rules to make the context SAT and extract obligations
-            assumptions = [Bool(key, solver.ctx) for key in self.__rules.keys() if key not in violations]
-            if solver.check(assumptions) == sat:
-                result['obligations'] = extractObligations()
+                # Disable violated rules to make the context SAT and extract obligations
+                if reason is None:
+                    assumptions = [Bool(key, solver.ctx) for key in rules if key not in violations]
+                    try:
+                        if self.__solve(assumptions + active, budgets)[0] == sat:
+                            result['obligations'] = self.__extractObligations(extended_results)
+                    except UnknownResult as err:
+                        reason = self.__reason(err)
 
+                # The explanation or the obligations are incomplete
+                if reason is not None:
+                    result['reason'] = reason
+
+            if stats is not None:
+                result['statistics'] = stats
+
+        finally:
+            self.__limit([])
+            self.pop(License)
 
-        self.pop(License)
         return result
 
 
-    def checkComponent(self, comp: Component, extended_results: bool = True, lics: t.Optional[t.Iterable[str]] = None):
-        self.push(comp)
+    def ruleCosts(self, lic: License) -> t.Dict[str, t.Any]:
+        """
+        Attributes the solver effort of checking the license in the current scope to the rules.
+        The license is checked with all rules and once with each rule disabled, every check in a new scope
+        of the license, so that the checks do not reuse the facts learned by the others.
+        The cost of a rule is the difference of the resource counts (rlimit) of both checks, 
+        the status is the verdict without the rule.
+        """
+        assumptions = {key: Bool(key, self.context) for key in self.__rules.keys()}
+
+        def check(disabled: t.Optional[str] = None) -> t.Tuple[str, float]:
+            self.push(lic)
+            status, stats = self.__check([a for k, a in assumptions.items() if k != disabled] + self.__active())
+            self.pop(License)
+
+            return 'SAT' if status == sat else 'UNSAT', stats.get('rlimit count', 0)
+
+        status, rlimit = check()
+        result = {
+            'status': status,
+            'rlimit': rlimit,
+            'rules': {}
+        }
+
+        for key in assumptions:
+            status, cost = check(key)
+            result['rules'][self.__rules[key].key] = {
+                'status': status,
+                'cost': rlimit - cost
+            }
+
+        return result
 
+    def profileRules(self, mod: Module) -> t.Dict[str, t.Any]:
+        """
+        Attributes the solver effort of checking the module to the rules, see ruleCosts().
+        The costs of a rule are summed up over all checked licenses, changed counts the checks whose verdict
+        changes without the rule.
+        """
+        licenses: t.Dict[str, t.Dict[str, t.Any]] = {}
+        rules: t.Dict[str, t.Dict[str, t.Any]] = {}
+
+        self.push(mod)
+
+        for comp in mod.components:
+            self.push(comp)
+
+            for l in comp.licenses:
+                if (lic := self.__licenses.get(l)) is None:
+                    logging.warning(f'License {l} is not defined in the engine. Skipping...')
+                    continue
+
+                costs = self.ruleCosts(lic)
+
+                entry = licenses.setdefault(l, {'checks': 0, 'rlimit': 0})
+                entry['checks'] += 1
+                entry['rlimit'] += costs['rlimit']
+
+                for key, cost in costs['rules'].items():
+                    entry = rules.setdefault(key, {'cost': 0, 'changed': 0})
+                    entry['cost'] += cost['cost']
+                    entry['changed'] += int(cost['status'] != costs['status'])
+
+            self.pop(Component)
+
+        self.pop(Module)
+
+        total = sum(l['rlimit'] for l in licenses.values())
+        for entry in rules.values():
+            entry['share'] = entry['cost'] / total if total else 0.0
+
+        return {
+            'rlimit': total,
+            'licenses': dict(sorted(licenses.items(), key=lambda i: -i[1]['rlimit'])),
+            'rules': dict(sorted(rules.items(), key=lambda i: -i[1]['cost']))
+        }
+
+
+    def __explain(self, 
+                  assumptions: t.List[BoolRef], 
+                  active: t.List[BoolRef], 
+                  budgets: t.List[Budget]) -> t.Tuple[t.List[str], bool, t.Optional[str]]:
+        """
+        Collects the keys of the rules in the minimal unsatisfiable subsets of the assumptions 
+        and whether all subsets have been enumerated. The active indicator literals are always assumed.
+        If a budget runs out, the rules of the subsets found so far are returned together with the reason.
+        """
+        solver = self.__solver
+        c_solver = SubsetSolver(assumptions, solver, background=active, before_check=lambda: self.__limit(budgets))
+
+        muses: t.List[t.List[BoolRef]] = []
+        reason = None
+
+        try:
+            if self.explanation == EXPLAIN_FIRST:
+                # The core of the failed check is shrunk to a MUS
+                muses, complete = [c_solver.to_c_lits(c_solver.shrink(c_solver.seed_from_core()))], False
+
+            elif self.explanation == EXPLAIN_MUS:
+                deadline = time.monotonic() + self.explanationTimeout if self.explanationTimeout else None
+                _, complete = enumerate_muses(c_solver, MapSolver(n=c_solver.n), limit=self.maxCores, deadline=deadline, muses=muses)
+
+            else:
+                m_solver = MapSolver(n=c_solver.n)
+                for orig, tags in enumerate_sets(c_solver, m_solver):
+                    if orig == 'MUS':
+                        muses.append(tags)
+                complete = True
+
+        except UnknownResult as err:
+            complete, reason = False, self.__reason(err)
+
+        violations = []
+        for tags in muses:
+            for tag in tags:
+                tn = tag.decl().name()
+                violations.append(self.__rules[tn].key)
+
+        return violations, complete, reason
+
+
+    def checkComponent(self, comp: Component, extended_results: bool = True, lics: t.Optional[t.Iterable[str]] = None):
         if not lics:
             lics = comp.licenses
 
         result = {}
+        keys = {}
+
+        if self.cache is not None:
+            modProps = self.__modsProps[-1] if self.__modsProps else None
+            for l in lics:
+                keys[l] = resultKey(self.__digest, modProps, comp.properties, l, extended_results, self.options)
+                if (cached := self.cache.get(keys[l])) is not None:
+                    result[l] = cached
+
+        if len(result) < len(set(lics)):
+            self.push(comp)
+
+            for l in lics:
+                if l in result:
+                    continue
+
+                lic = self.__licenses.get(l, None)
+                if lic is None:
+                    logging.warning(f'License {l} is not defined in the engine. Skipping...')
+                    result[l] = {
+                        'status': 'UNKNOWN',
+                        'reason': 'License could not be matched correctly'
+                    }
+                else:
+                    result[l] = self.checkLicense(lic, extended_results=extended_results)
 
-        for l in lics:
-            lic = self.__licenses.get(l, None)
-            if lic is None:
-                logging.warning(f'License {l} is not defined in the engine. Skipping...')
-                result[l] = {
-                    'status': 'UNKNOWN',
-                    'reason': 'License could not be matched correctly'
-                }
-            else:
-                result[l] = self.checkLicense(lic, extended_results=extended_results)
+                    # Results cut short by a budget are not cached
+                    if self.cache is not None and 'reason' not in result[l]:
+                        self.cache.put(keys[l], result[l])
+
+            self.pop(Component)
+
+        return {l: result[l] for l in lics}
+
+
+    def checkModule(self, 
+                    mod: Module, 
+                    extended_results: bool = True, 
+                    comps: t.Optional[t.Iterable[Component]] = None,
+                    jobs: int = 1):
+        """
+        Checks the module components against their licenses.
+        Equivalent components, i.e. with the same properties and licenses, are checked only once.
+        With more than one job, the components are checked in parallel by worker processes.
+        """
+        comps = list(comps if comps else mod.components)
+
+        # Components with the same properties and licenses are checked once
+        groups: t.Dict[str, t.List[Component]] = {}
+        for c in comps:
+            key = json.dumps([c.properties, sorted(set(c.licenses))], sort_keys=True)
+            groups.setdefault(key, []).append(c)
+
+        unique = [g[0] for g in groups.values()]
+
+        saved = sum(len(set(c.licenses)) for g in groups.values() for c in g[1:])
+        if saved:
+            self.__stats['saved'] += saved
+            logger.info(f'{len(unique)} of {sum(len(g) for g in groups.values())} components are distinct, {saved} license checks saved')
+
+        if jobs != 1:
+            from . import batch
+            checked = batch.checkModule(self, mod, unique, jobs=jobs, extended_results=extended_results)
+        else:
+            self.push(mod)
+            checked = {c.key: self.checkComponent(c, extended_results=extended_results) for c in unique}
+            self.pop(Module)
+
+        result = {}
+        for g in groups.values():
+            first = checked[g[0].key]
+            for c in g:
+                result[c.key] = first if c is g[0] else {l: copy.deepcopy(first[l]) for l in c.licenses}
+
+        return {c.key: result[c.key] for c in comps}
 
-        self.pop(Component)
-        return result
 
+    def iterCheckModule(self,
+                        mod: Module,
+                        comps: t.Iterable[Component],
+                        extended_results: bool = True) -> t.Iterator[t.Tuple[Component, t.Dict[str, t.Any]]]:
+        """
+        Checks the components one at a time and yields each component with its result,
+        so that the components can be read lazily, e.g. from an SBOM.
+        Only the results of the distinct components are kept, equivalent components reuse them.
+        """
+        checked: t.Dict[str, t.Dict[str, t.Any]] = {}
 
-    def checkModule(self, mod: Module, extended_results: bool = True, comps: t.Optional[t.Iterable[Component]] = None):
         self.push(mod)
+        try:
+            for c in comps:
+                key = json.dumps([c.properties, sorted(set(c.licenses))], sort_keys=True)
 
-        if not comps:
-            comps = mod.components
+                if (first := checked.get(key)) is None:
+                    first = checked[key] = self.checkComponent(c, extended_results=extended_results)
+                    yield c, first
+                else:
+                    self.__stats['saved'] += len(set(c.licenses))
+                    yield c, {l: copy.deepcopy(first[l]) for l in c.licenses}
+        finally:
+            self.pop(Module)
 
-        result = {c.key: self.checkComponent(c, extended_results=extended_results) for c in comps}
 
-        self.pop(Module)
-        return result
+    def checkModules(self, paths: t.Iterable[Path], jobs: int = 1, extended_results: bool = True) -> t.Dict[str, t.Any]:
+        """
+        Checks the module files and returns a merged report.
+        With more than one job, the modules are distributed across worker processes each holding its own engine.
+        """
+        from .batch import checkModules
+        return checkModules(self, paths, jobs=jobs, extended_results=extended_results)
 
 
 _package_definitions_path=os.environ.get('TS_LEGALCHECK_DEFINITIONS_PATH', Path(__file__).parent / 'definitions')
     
-def loadDefinitions(paths: t.Union[Path, t.Iterable[Path]]) -> t.Dict[str, t.Dict[str, t.Any]]:                
+def loadDefinitionFiles(paths: t.Union[Path, t.Iterable[Path]]) -> t.List[t.Tuple[Path, t.Dict[str, t.Any]]]:
+    """
+    Resolves the given definition files together with all their includes.
+    Returns the list of resolved files with their definitions in the loading order.
+    The result is kept in the cache directory given by the TS_LEGALCHECK_DEFINITIONS_CACHE environment variable, if set,
+    and read from it as long as none of the files has changed.
+    """
+    roots = [paths] if isinstance(paths, Path) else list(paths)
+
+    if cache := os.environ.get('TS_LEGALCHECK_DEFINITIONS_CACHE'):
+        start = time.perf_counter()
+
+        if (files := defcache.read(Path(cache), roots)) is not None:
+            if (instrumentation := getInstrumentation()) is not None:
+                instrumentation.emit(TimingEvent(PHASE_READ, time.perf_counter() - start))
+
+            logger.info(f'Definitions loaded from cache {cache}')
+            return files
+
+    files, sources = _readDefinitionFiles(roots)
+
+    if cache:
+        defcache.write(Path(cache), roots, files, sources)
+
+    return files
+
+
+def _readDefinitionFiles(paths: t.List[Path]) -> t.Tuple[t.List[t.Tuple[Path, t.Dict[str, t.Any]]], t.List[Path]]:
+    """
+    Reads the definition files and their includes, returns the definitions together with all files read
+    """
     def resolve_path(path: Path, parent: t.Optional[Path] = None) -> t.Optional[Path]:
         if path.exists():
             return path
@@ -425,20 +1387,23 @@ def loadDefinitions(paths: t.Union[Path, t.Iterable[Path]]) -> t.Dict[str, t.Dic
 
         return None
 
-    result = {}
-    
+    result = []
+    sources = []
 
-    if isinstance(paths, Path):
-        _paths = [(paths, None)]        
-    elif isinstance(paths, t.Iterable):
-        _paths: t.List[t.Tuple[Path, t.Optional[Path]]] = [(p, None) for p in paths]
-    else:
-        _paths = []
+    _paths: t.List[t.Tuple[Path, t.Optional[Path]]] = [(p, None) for p in paths]
         
     while len(_paths) > 0:
         if p := resolve_path(*_paths.pop()):
             logger.info(f'Loading definitions from {p}...')
-            if defs := utils.load_file(p):
+            sources.append(p)
+
+            start = time.perf_counter()
+            defs = utils.load_file(p)
+
+            if (instrumentation := getInstrumentation()) is not None:
+                instrumentation.emit(TimingEvent(PHASE_READ, time.perf_counter() - start))
+
+            if defs:
                 for include in defs.pop('Includes', []):
                     if "*" in include:
                         includes = [(Path(include_path), p.parent) for include_path in glob.glob(include, root_dir=p.parent)]
@@ -449,30 +1414,71 @@ def loadDefinitions(paths: t.Union[Path, t.Iterable[Path]]) -> t.Dict[str, t.Dic
                     else:            
                         _paths.append((Path(include), p.parent))
                 
+                result.append((p, defs))
 
-                for k, _d in defs.items():
-                    if _e := result.get(k, None):
-                        if type(_d) is list and type(_e) is list:
-                            _e.extend(_d)
-                        elif type(_d) is dict and type(_e) is dict:
-                            _e.update(_d)
-                        else:
-                            raise ValueError(f"Cannot merge {k} definitions from {p.name}. Not compatible types.")
-                    else:
-                        result[k] = _d
+    return result, sources
+
+
+def mergeDefinitions(files: t.Iterable[t.Tuple[Path, t.Dict[str, t.Any]]]) -> t.Dict[str, t.Dict[str, t.Any]]:
+    result = {}
+
+    for p, defs in files:
+        for k, _d in defs.items():
+            if _e := result.get(k, None):
+                if type(_d) is list and type(_e) is list:
+                    _e.extend(_d)
+                elif type(_d) is dict and type(_e) is dict:
+                    _e.update(_d)
+                else:
+                    raise ValueError(f"Cannot merge {k} definitions from {p.name}. Not compatible types.")
+            else:
+                # Copy the top-level container to keep the per-file definitions intact
+                result[k] = _d.copy() if isinstance(_d, (list, dict)) else _d
 
     return result
 
 
-def createEngine(paths: t.List[Path]) -> Engine:
-    defs = loadDefinitions(paths)
-    return createEngineWithDefinitions(defs)
+def loadDefinitions(paths: t.Union[Path, t.Iterable[Path]]) -> t.Dict[str, t.Dict[str, t.Any]]:
+    return mergeDefinitions(loadDefinitionFiles(paths))
+
+
+def createEngine(paths: t.List[Path], encoding: str = ENCODING_QUANTIFIED) -> Engine:
+    files = loadDefinitionFiles(paths)
+
+    engine = createEngineWithDefinitions(mergeDefinitions(files), encoding=encoding, files=files)
+    engine.sources.extend(p for p, _ in files)
+
+    return engine
+
+
+def createEngineWithSnapshot(path: Path, paths: t.Optional[t.List[Path]] = None, encoding: t.Optional[str] = None) -> Engine:
+    """
+    Loads the engine from a snapshot file. If the snapshot does not exist or is outdated, 
+    the engine is created from the definitions and the snapshot is (re)written.
+    Without definition paths, the definitions recorded in the snapshot are used.
+    """
+    if path.exists():
+        if engine := Engine.loadSnapshot(path, encoding=encoding):
+            return engine
+        
+        if not paths:
+            paths = snapshot.roots(path)
+
+    if not paths:
+        raise EngineError(f'Cannot create snapshot {str(path)}: no definitions given')
+
+    engine = createEngine(paths, encoding=encoding or ENCODING_QUANTIFIED)
+    engine.save(path, roots=paths)
+
+    return engine
 
 
-def createEngineWithDefinitions(defs: dict) -> Engine:
+def createEngineWithDefinitions(defs: dict, 
+                                encoding: str = ENCODING_QUANTIFIED, 
+                                files: t.Optional[t.List[t.Tuple[Path, t.Dict[str, t.Any]]]] = None) -> Engine:
     solver = Solver(ctx = Context())
-    engine = Engine(solver = solver)
-    engine.load(defs)
+    engine = Engine(solver = solver, encoding = encoding)
+    engine.load(defs, files=files)
 
     logger.info('ts-legalcheck engine loaded')
 
@@ -0,0 +1,183 @@
+import os
+import glob
+import time
+import logging
+import multiprocessing
+import typing as t
+
+from pathlib import Path
+
+from . import EngineError
+from .context import Module, Component
+
+
+logger = logging.getLogger('ts_legalcheck.engine')
+
+MODULE_FILE_SUFFIXES = ('.json', '.toml', '.yaml', '.yml')
+
+
+def findModules(pattern: t.Union[str, Path]) -> t.List[Path]:
+    """
+    Resolves a directory or a glob pattern into the list of module files.
+    """
+    path = Path(pattern)
+
+    if path.is_dir():
+        paths = [p for p in path.iterdir() if p.is_file() and p.suffix in MODULE_FILE_SUFFIXES]
+    elif path.is_file():
+        paths = [path]
+    else:
+        paths = [Path(p) for p in glob.glob(str(pattern), recursive=True)]
+        paths = [p for p in paths if p.is_file() and p.suffix in MODULE_FILE_SUFFIXES]
+
+    return sorted(paths)
+
+
+def checkModuleFile(engine, path: Path, extended_results: bool = True) -> t.Dict[str, t.Any]:
+    """
+    Loads and checks a single module file. Errors are reported as a part of the result.
+    """
+    start = time.perf_counter()
+
+    try:
+        mod = Module.load(path)
+    except (ValueError, KeyError, TypeError) as err:
+        logger.error(f'Cannot load module {str(path)}: {err}')
+        mod = None
+
+    if mod is None:
+        return {'error': 'Module could not be loaded'}
+
+    before = engine.cache.statistics if engine.cache is not None else None
+    saved = engine.statistics['saved']
+    extraction = engine.statistics['extraction']
+
+    result = engine.checkModule(mod, extended_results=extended_results)
+
+    report = {
+        'module': mod.key,
+        'time': time.perf_counter() - start,
+        'saved': engine.statistics['saved'] - saved,
+        'extraction': engine.statistics['extraction'] - extraction,
+        'result': result
+    }
+
+    if before is not None:
+        after = engine.cache.statistics
+        report['cache'] = {k: after[k] - before[k] for k in ('hits', 'misses')}
+
+    return report
+
+
+# Worker processes
+
+_parent_engine = None
+_worker_engine = None
+
+
+def _initWorker(data: t.Optional[t.Dict[str, t.Any]] = None, options: t.Optional[t.Dict[str, t.Any]] = None):
+    from . import Engine
+
+    global _worker_engine
+
+    if data is None:
+        # The engine is inherited from the parent process, its solver is translated 
+        # into a new context owned by the worker
+        _worker_engine = t.cast(Engine, _parent_engine).fork()
+    else:
+        _worker_engine = Engine.fromSnapshot(data)
+        _worker_engine.configure(**(options or {}))
+
+
+def createPool(engine, jobs: int):
+    """
+    Creates a pool of worker processes, each of them holding its own copy of the engine.
+    """
+    global _parent_engine
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        _parent_engine = engine
+        return multiprocessing.get_context('fork').Pool(jobs, initializer=_initWorker)
+    
+    return multiprocessing.Pool(jobs, initializer=_initWorker, initargs=(engine.toSnapshot(), engine.options))
+
+
+def _checkModuleFileInWorker(args: t.Tuple[Path, bool]) -> t.Dict[str, t.Any]:
+    path, extended_results = args
+    return checkModuleFile(_worker_engine, path, extended_results=extended_results)
+
+
+def _checkComponentsInWorker(args: t.Tuple[Module, t.List[Component], bool]) -> t.List[t.Tuple[str, t.Dict[str, t.Any]]]:
+    mod, comps, extended_results = args
+    result = t.cast(t.Any, _worker_engine).checkModule(mod, extended_results=extended_results, comps=comps)
+    return list(result.items())
+
+
+def checkModule(engine,
+                mod: Module,
+                comps: t.Iterable[Component],
+                jobs: int,
+                extended_results: bool = True) -> t.Dict[str, t.Any]:
+    """
+    Checks the components of a module in parallel. The components are sharded across the worker processes, 
+    the results are merged in the order of the components.
+    """
+    comps = list(comps)
+    jobs = min(jobs if jobs > 0 else (os.cpu_count() or 1), max(len(comps), 1))
+
+    if jobs == 1:
+        return engine.checkModule(mod, extended_results=extended_results, comps=comps)
+
+    # Every shard is checked as a module of its own, so the budget of the module cannot be kept across the workers
+    if engine.moduleTimeout or engine.moduleRlimit:
+        raise EngineError('Module budgets cannot be combined with checking the components of a module in parallel')
+
+    # Several shards per worker to balance components with different number of licenses
+    size = max(1, -(-len(comps) // (jobs * 4)))
+    shard = Module(mod.key, mod.properties)
+
+    tasks = [(shard, comps[i:i + size], extended_results) for i in range(0, len(comps), size)]
+
+    with createPool(engine, jobs) as pool:
+        results = pool.map(_checkComponentsInWorker, tasks, chunksize=1)
+
+    return {k: r for result in results for k, r in result}
+
+
+def checkModules(engine,
+                 paths: t.Iterable[Path],
+                 jobs: int = 1,
+                 extended_results: bool = True) -> t.Dict[str, t.Any]:
+    """
+    Checks the module files and merges the results into a single report.
+    The engine is built once, with several jobs every worker process receives its own copy of it.
+    """
+    paths = list(paths)
+    jobs = min(jobs if jobs > 0 else (os.cpu_count() or 1), max(len(paths), 1))
+
+    start = time.perf_counter()
+
+    if jobs > 1:
+        with createPool(engine, jobs) as pool:
+            results = pool.map(_checkModuleFileInWorker, [(p, extended_results) for p in paths], chunksize=1)
+    else:
+        results = [checkModuleFile(engine, p, extended_results=extended_results) for p in paths]
+
+    modules = {str(p): r for p, r in zip(paths, results)}
+
+    summary = {
+        'modules': len(modules),
+        'failed': sum(1 for r in modules.values() if 'error' in r),
+        'jobs': jobs,
+        'saved': sum(r.get('saved', 0) for r in modules.values()),
+        'extraction': sum(r.get('extraction', 0.0) for r in modules.values()),
+        'time': time.perf_counter() - start
+    }
+
+    if engine.cache is not None:
+        summary['cache'] = {k: sum(r.get('cache', {}).get(k, 0) for r in modules.values()) for k in ('hits', 'misses')}
+
+    return {
+        'modules': modules,
+        'summary': summary
+    }
@@ -0,0 +1,55 @@
+import json
+import hashlib
+import typing as t
+
+from pathlib import Path
+from dataclasses import dataclass
+
+
+# Sections of the definitions, whose entries are loaded as independent blocks, in the loading order
+BLOCK_SECTIONS = ('Constraints', 'Rights', 'Terms', 'Obligations', 'Rules')
+
+
+@dataclass
+class Block:
+    """
+    A license, right, term, obligation or rule of the definitions together with the file it was read from
+    """
+    section: str
+    name: str
+    data: t.Any
+    source: t.Optional[Path] = None
+
+    def digest(self, variants: t.Optional[t.Dict[str, t.Any]] = None) -> str:
+        """
+        Identifies the content of the block. The facts of the obligations depend on the variants, too.
+        """
+        data = [self.section, self.name, self.data]
+        if self.section == 'Obligations':
+            data.append(variants or {})
+
+        return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def definitionBlocks(files: t.Iterable[t.Tuple[t.Optional[Path], t.Dict[str, t.Any]]]) -> t.Dict[str, Block]:
+    """
+    Splits the definition files into blocks keyed by the section and the name, in the loading order.
+    The blocks are the same as of the merged definitions: an entry of a later file replaces the entry
+    of the same name keeping its position, rules are appended. Rules are numbered per key, as the keys
+    need not be unique.
+    """
+    sections: t.Dict[str, t.Dict[str, Block]] = {s: {} for s in BLOCK_SECTIONS}
+    rules: t.Dict[str, int] = {}
+
+    for path, defs in files:
+        for section, blocks in sections.items():
+            if section == 'Rules':
+                for rule in defs.get(section, []):
+                    key = rule.get('key', '')
+                    rules[key] = rules.get(key, -1) + 1
+                    blocks[f'{section}/{key}#{rules[key]}'] = Block(section, key, rule, path)
+            else:
+                for name, data in defs.get(section, {}).items():
+                    blocks[f'{section}/{name}'] = Block(section, name, data, path)
+
+    return {k: b for blocks in sections.values() for k, b in blocks.items()}
@@ -0,0 +1,84 @@
+import time
+import typing as t
+
+from dataclasses import dataclass
+
+from .marco import UnknownResult
+
+
+# Timeout of the solver in milliseconds, which disables the limit
+NO_TIMEOUT = 4294967295
+
+# Scopes of the budgets named in the reasons of UNKNOWN results
+SCOPE_CHECK = 'Check'
+SCOPE_MODULE = 'Module'
+
+
+class _Unbounded(object):
+    def __repr__(self) -> str:
+        return 'UNBOUNDED'
+
+
+# Passed to Engine.configure instead of a bound or budget to remove it, None keeps the configured one
+UNBOUNDED: t.Any = _Unbounded()
+
+
+@dataclass
+class Budget:
+    """
+    Time and resources left to the checks of a scope. The deadline is a time.monotonic() value,
+    the resource limit is the resource count of the solver (rlimit count) at which the budget is exhausted.
+    """
+    scope: str
+    deadline: t.Optional[float] = None
+    rlimit: t.Optional[float] = None
+
+    @staticmethod
+    def start(scope: str, timeout: t.Optional[float], rlimit: t.Optional[int], count: t.Callable[[], float]) -> t.Optional['Budget']:
+        """
+        Starts the budget of a scope with the time in seconds and the resources, None if both are unbounded.
+        """
+        if not timeout and not rlimit:
+            return None
+
+        return Budget(scope, time.monotonic() + timeout if timeout else None, count() + rlimit if rlimit else None)
+
+
+class Limits(t.NamedTuple):
+    """
+    Limits of the next solver checks together with the scopes of the budgets they are derived from
+    """
+    timeout: t.Optional[float] = None
+    rlimit: t.Optional[float] = None
+    timeoutScope: t.Optional[str] = None
+    rlimitScope: t.Optional[str] = None
+
+
+def limits(budgets: t.Iterable[Budget], count: t.Callable[[], float]) -> Limits:
+    """
+    Returns the smallest time in seconds and resources left of the budgets.
+    Raises UnknownResult if a budget is exhausted.
+    """
+    budgets = list(budgets)
+    now = time.monotonic()
+    used = count() if any(b.rlimit is not None for b in budgets) else 0.0
+
+    result = Limits()
+    for b in budgets:
+        if b.deadline is not None:
+            left = b.deadline - now
+            if left <= 0:
+                raise UnknownResult(f'{b.scope} time budget exceeded')
+
+            if result.timeout is None or left < result.timeout:
+                result = result._replace(timeout=left, timeoutScope=b.scope)
+
+        if b.rlimit is not None:
+            left = b.rlimit - used
+            if left < 1:
+                raise UnknownResult(f'{b.scope} resource budget exceeded')
+
+            if result.rlimit is None or left < result.rlimit:
+                result = result._replace(rlimit=left, rlimitScope=b.scope)
+
+    return result
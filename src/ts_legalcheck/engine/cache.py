@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import collections
+import typing as t
+
+import z3
+
+from pathlib import Path
+
+
+logger = logging.getLogger('ts_legalcheck.engine')
+
+# Changes whenever the results of the engine change for the same definitions
+CACHE_VERSION = 2
+
+# Default limit of the in-memory tier in bytes of the cached results
+DEFAULT_CACHE_SIZE = 64 * 1024 * 1024
+
+# Default limit of the number of results in the on-disk tier
+DEFAULT_DISK_ENTRIES = 1000000
+
+# Number of results hit on disk, whose time of use is written at once
+USED_BATCH_SIZE = 256
+
+
+def resultKey(digest: str,
+              modProps: t.Optional[t.Dict[str, bool]],
+              compProps: t.Dict[str, bool],
+              lic: str,
+              extended_results: bool,
+              options: t.Optional[t.Dict[str, t.Any]] = None) -> str:
+    """
+    Content address of a license check: the model digest together with
+    the module and component properties, the license key and the check options.
+    """
+    data = json.dumps([CACHE_VERSION, z3.get_version_string(), digest, modProps, compProps, lic, extended_results, options],
+                      sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class ResultCache(object):
+    """
+    Cache of license check results with an in-memory LRU tier limited by the size of the results
+    and an optional on-disk SQLite tier, which is shared across processes and runs.
+    Results are addressed by their inputs and the model digest, results of changed definitions are never hit.
+    """
+    def __init__(self,
+                 path: t.Optional[Path] = None,
+                 size: int = DEFAULT_CACHE_SIZE,
+                 diskEntries: int = DEFAULT_DISK_ENTRIES):
+        self.__path = path
+        self.__size = size
+        self.__diskEntries = diskEntries
+
+        self.__entries: collections.OrderedDict[str, str] = collections.OrderedDict()
+        self.__bytes = 0
+        self.__lock = threading.Lock()
+
+        self.__db: t.Optional[sqlite3.Connection] = None
+        self.__pid = None
+
+        # Times of use of the results hit on disk, which are not written yet
+        self.__used: t.Dict[str, float] = {}
+
+        self.__stats = {'hits': 0, 'misses': 0, 'diskHits': 0, 'evictions': 0}
+
+    @property
+    def path(self) -> t.Optional[Path]:
+        return self.__path
+
+    @property
+    def statistics(self) -> t.Dict[str, int]:
+        """
+        Hit and miss counters together with the size of the in-memory tier
+        """
+        with self.__lock:
+            return dict(self.__stats, entries=len(self.__entries), bytes=self.__bytes)
+
+    def __connect(self) -> t.Optional[sqlite3.Connection]:
+        if self.__path is None:
+            return None
+
+        # Connections cannot be shared with forked worker processes
+        if self.__db is None or self.__pid != os.getpid():
+            try:
+                self.__db = sqlite3.connect(str(self.__path), timeout=30.0, check_same_thread=False)
+                self.__db.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, used REAL NOT NULL)')
+                self.__db.commit()
+            except sqlite3.Error as err:
+                logger.error(f'Cannot open result cache {str(self.__path)}: {err}')
+                self.__path = None
+                self.__db = None
+
+            self.__pid = os.getpid()
+
+        return self.__db
+
+    def __writeUsed(self, db: sqlite3.Connection):
+        if self.__used:
+            db.executemany('UPDATE results SET used = ? WHERE key = ?', [(used, key) for key, used in self.__used.items()])
+            self.__used.clear()
+
+    def __remember(self, key: str, value: str):
+        if (old := self.__entries.pop(key, None)) is not None:
+            self.__bytes -= len(old)
+
+        self.__entries[key] = value
+        self.__bytes += len(value)
+
+        while self.__bytes > self.__size and self.__entries:
+            _, evicted = self.__entries.popitem(last=False)
+            self.__bytes -= len(evicted)
+            self.__stats['evictions'] += 1
+
+    def get(self, key: str) -> t.Optional[t.Dict[str, t.Any]]:
+        with self.__lock:
+            if (value := self.__entries.get(key)) is not None:
+                self.__entries.move_to_end(key)
+                self.__stats['hits'] += 1
+                return json.loads(value)
+
+            if db := self.__connect():
+                try:
+                    row = db.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+                    # The times of use only order the results for pruning, they are written in batches
+                    if row is not None:
+                        self.__used[key] = time.time()
+                        if len(self.__used) >= USED_BATCH_SIZE:
+                            self.__writeUsed(db)
+                            db.commit()
+                except sqlite3.Error as err:
+                    logger.warning(f'Cannot read result cache {str(self.__path)}: {err}')
+                    row = None
+
+                if row is not None:
+                    self.__remember(key, row[0])
+                    self.__stats['hits'] += 1
+                    self.__stats['diskHits'] += 1
+                    return json.loads(row[0])
+
+            self.__stats['misses'] += 1
+            return None
+
+    def put(self, key: str, result: t.Dict[str, t.Any]):
+        value = json.dumps(result, separators=(',', ':'))
+
+        with self.__lock:
+            self.__remember(key, value)
+
+            if db := self.__connect():
+                try:
+                    self.__writeUsed(db)
+                    db.execute('INSERT OR REPLACE INTO results (key, value, used) VALUES (?, ?, ?)', (key, value, time.time()))
+                    db.commit()
+                except sqlite3.Error as err:
+                    logger.warning(f'Cannot write result cache {str(self.__path)}: {err}')
+
+    def prune(self):
+        """
+        Removes the least recently used results from the on-disk tier above its limit.
+        The results are only sorted and removed, if there are more than the limit.
+        """
+        with self.__lock:
+            if db := self.__connect():
+                try:
+                    self.__writeUsed(db)
+
+                    count, = db.execute('SELECT COUNT(*) FROM results').fetchone()
+                    if count > self.__diskEntries:
+                        db.execute('DELETE FROM results WHERE key NOT IN (SELECT key FROM results ORDER BY used DESC LIMIT ?)',
+                                   (self.__diskEntries,))
+
+                    db.commit()
+                except sqlite3.Error as err:
+                    logger.warning(f'Cannot prune result cache {str(self.__path)}: {err}')
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
+            self.__used.clear()
+
+            if db := self.__connect():
+                db.execute('DELETE FROM results')
+                db.commit()
+
+    def close(self):
+        with self.__lock:
+            if self.__db is not None and self.__pid == os.getpid():
+                try:
+                    self.__writeUsed(self.__db)
+                    self.__db.commit()
+                except sqlite3.Error as err:
+                    logger.warning(f'Cannot write result cache {str(self.__path)}: {err}')
+
+                self.__db.close()
+
+            self.__db = None
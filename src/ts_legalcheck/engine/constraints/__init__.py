@@ -8,17 +8,19 @@ class TSDataTypes:
     """
     def __init__(self, ctx: z3.Context):
         _Module = z3.Datatype('Module', ctx)
-        _Module.declare('make', ('id', z3.IntSort(ctx)))
+        # Constructors and accessors are named uniquely per sort to keep
+        # the SMT-LIB2 representation of the assertions unambiguous
+        _Module.declare('mkModule', ('moduleId', z3.IntSort(ctx)))
 
         _Component = z3.Datatype('Component', ctx)
-        _Component.declare('make', ('id', z3.IntSort(ctx)))
+        _Component.declare('mkComponent', ('componentId', z3.IntSort(ctx)))
 
         _License = z3.Datatype('License', ctx)
-        _License.declare('make', ('id', z3.IntSort(ctx)))
+        _License.declare('mkLicense', ('licenseId', z3.IntSort(ctx)))
 #        _License.declare('None')
 
         _Constraint = z3.Datatype('Constraint', ctx)
-        _Constraint.declare('make', ('id', z3.IntSort(ctx)))
+        _Constraint.declare('mkConstraint', ('constraintId', z3.IntSort(ctx)))
 
         self.Module, self.Component = z3.CreateDatatypes(_Module, _Component)
         self.License, self.Constraint = z3.CreateDatatypes(_License, _Constraint)
@@ -41,17 +43,25 @@ class TSObject(object):
     """
     __const_counter = 0
     
-    def __init__(self, key: str):
+    def __init__(self, key: str, constKey: t.Optional[int] = None):
         self.__key = key
-        self.__const_key = TSObject.__const_counter        
-        TSObject.__const_counter += 1
+
+        if constKey is None:
+            constKey = TSObject.__const_counter
+        
+        self.__const_key = constKey
+        TSObject.__const_counter = max(TSObject.__const_counter, constKey + 1)
     
     @property
     def key(self):
         return self.__key
 
+    @property
+    def constKey(self) -> int:
+        return self.__const_key
+
     def const(self, dt):
-        return dt.make(self.__const_key)
+        return dt.constructor(0)(self.__const_key)
 
 
 class License(TSObject):
@@ -98,6 +108,10 @@ class ConstraintsBuilder(object):
     def types(self):
         return self.__dt
 
+    @property
+    def constraints(self) -> t.Dict[str, Constraint]:
+        return self.__constraints
+
     def makeCnstr(self, cnstrId: str) -> Constraint:
         cnstr = self.__constraints.get(cnstrId)
         if not cnstr:
@@ -1,12 +1,37 @@
+import os
 import z3
+import functools
 import typing as t
 
-from lark import Lark, Transformer, Token
+from lark import Lark, Transformer, Token, Tree
 from pathlib import Path
 
 from .. import ConstraintsBuilder
 
 
+GRAMMAR_PATH = Path(__file__).parent / "grammar.lark"
+
+
+@functools.lru_cache(maxsize=None)
+def get_parser() -> Lark:
+	"""
+	Returns the LALR parser of the constraints grammar, which is built once per process.
+	The parse table is stored in and loaded from the file given by the TS_LEGALCHECK_PARSER_CACHE environment variable, if set.
+	"""
+	cache = os.environ.get('TS_LEGALCHECK_PARSER_CACHE') or False
+
+	with GRAMMAR_PATH.open("r") as fp:
+		return Lark(grammar=fp, parser='lalr', cache=cache)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_tree(cnstr: str) -> Tree:
+	"""
+	Parses the constraint text, the trees are shared by all parsers of the process.
+	"""
+	return get_parser().parse(cnstr)
+
+
 class Parser(Transformer):
 	"""
 	A class to handle parsing of constraints using the Lark parser.
@@ -17,10 +42,7 @@ class Parser(Transformer):
 		"""
 		
 		self.__builder = builder
-
-		grammar_path = Path(__file__).parent / "grammar.lark"
-		with grammar_path.open("r") as fp:						
-			self.__parser = Lark(grammar=fp)
+		self.__exprs: t.Dict[str, z3.BoolRef] = {}
 
 	@staticmethod
 	def __mk_cnstr(builder: t.Callable[[str], z3.BoolRef], token: str) -> z3.BoolRef:
@@ -37,8 +59,11 @@ class Parser(Transformer):
 		:param text: The text to parse.
 		:return: The parsed result.
 		"""
-		tree = self.__parser.parse(cnstr)
-		return self.transform(tree)
+		if (expr := self.__exprs.get(cnstr)) is None:
+			expr = self.transform(parse_tree(cnstr))
+			self.__exprs[cnstr] = expr
+
+		return expr
 
 	"""
 	Transformer methods to handle the parsed tree.
@@ -1,15 +1,9 @@
 import sys
 
-from lark import Lark, Transformer
-from pathlib import Path
+from . import parse_tree
 
 try:
-	grammar_path = Path(__file__).parent / "grammar.lark"
-	
-	with grammar_path.open("r") as fp:
-		parser = Lark(grammar=fp)
-
-	result = parser.parse(sys.argv[1])
+	result = parse_tree(sys.argv[1])
 		
 	print(result)
 
@@ -0,0 +1,85 @@
+import os
+import pickle
+import hashlib
+import logging
+import typing as t
+
+from pathlib import Path
+
+from . import snapshot
+
+
+logger = logging.getLogger('ts_legalcheck.engine')
+
+DEFCACHE_VERSION = 1
+
+Files = t.List[t.Tuple[Path, t.Dict[str, t.Any]]]
+
+
+def cachePath(directory: Path, roots: t.Iterable[Path]) -> Path:
+    """
+    Cache file of the definitions resolved from the root files. Relative paths are resolved
+    against the working directory and the package definitions, so they are a part of the key.
+    """
+    key = [os.getcwd(), os.environ.get('TS_LEGALCHECK_DEFINITIONS_PATH', '')] + [str(p) for p in roots]
+    return directory / f'{hashlib.sha256(repr(key).encode()).hexdigest()}.defs'
+
+
+def read(directory: Path, roots: t.Iterable[Path]) -> t.Optional[Files]:
+    """
+    Reads the definition files resolved from the root files. Returns None if there is no cache entry
+    or any of the files read when resolving the definitions has changed.
+    """
+    path = cachePath(directory, roots)
+
+    try:
+        with path.open('rb') as fp:
+            data = pickle.load(fp)
+    except FileNotFoundError:
+        return None
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as err:
+        logger.error(f'Cannot read definitions cache {str(path)}: {err}')
+        return None
+
+    if not isinstance(data, dict) or data.get('version') != DEFCACHE_VERSION:
+        return None
+
+    for fp in data['sources']:
+        if not snapshot.isFresh(fp):
+            logger.info(f'Definitions cache {str(path)} is outdated: {fp["path"]} has changed')
+            return None
+
+    for d, mtime in data['directories'].items():
+        if not Path(d).exists() or Path(d).stat().st_mtime_ns != mtime:
+            logger.info(f'Definitions cache {str(path)} is outdated: content of {d} has changed')
+            return None
+
+    return data['files']
+
+
+def write(directory: Path, roots: t.Iterable[Path], files: Files, sources: t.Iterable[Path]):
+    """
+    Writes the definition files resolved from the root files together with the fingerprints of the sources,
+    i.e. all files read when resolving the definitions, including the ones which could not be decoded.
+    """
+    sources = list(sources)
+    path = cachePath(directory, roots)
+
+    data = {
+        'version': DEFCACHE_VERSION,
+        'sources': [snapshot.fingerprint(p) for p in sources],
+        'directories': snapshot.directories(sources),
+        'files': files
+    }
+
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+
+        tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        with tmp.open('wb') as fp:
+            pickle.dump(data, fp, protocol=pickle.HIGHEST_PROTOCOL)
+
+        tmp.replace(path)
+
+    except OSError as err:
+        logger.error(f'Cannot write definitions cache {str(path)}: {err}')
@@ -0,0 +1,118 @@
+import time
+import typing as t
+
+from dataclasses import dataclass, asdict
+
+
+# Reading and merging of the definition files
+PHASE_READ = 'read'
+
+# Loading of the definitions into the engine, includes parsing and asserting the facts
+PHASE_LOAD = 'load'
+
+# Parsing of a constraint
+PHASE_PARSE = 'parse'
+
+# Assertion of facts into the solver
+PHASE_ASSERT = 'assert'
+
+# Pushing and popping of a module, component or license, push includes the assertion of its facts
+PHASE_PUSH = 'push'
+PHASE_POP = 'pop'
+
+# Satisfiability check of the solver
+PHASE_CHECK = 'check'
+
+# Enumeration of the minimal unsatisfiable subsets explaining a violation
+PHASE_EXPLAIN = 'explain'
+
+# Extraction of the obligations from the model
+PHASE_EXTRACT = 'extract'
+
+PHASES = (PHASE_READ, PHASE_LOAD, PHASE_PARSE, PHASE_ASSERT, PHASE_PUSH, PHASE_POP, PHASE_CHECK, PHASE_EXPLAIN, PHASE_EXTRACT)
+
+
+@dataclass
+class TimingEvent:
+    phase: str
+    duration: float
+    module: t.Optional[str] = None
+    component: t.Optional[str] = None
+    license: t.Optional[str] = None
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class Instrumentation(object):
+    """
+    Receives the timing events of the engines. Subclasses override emit().
+    """
+    def emit(self, event: TimingEvent):
+        pass
+
+
+class Profile(Instrumentation):
+    """
+    Aggregates the timing events per phase and per license.
+    """
+    def __init__(self):
+        self.__phases: t.Dict[str, t.Dict[str, float]] = {}
+        self.__licenses: t.Dict[str, t.Dict[str, float]] = {}
+        self.__start = time.perf_counter()
+
+    def emit(self, event: TimingEvent):
+        for key, stats in ((event.phase, self.__phases), (event.license, self.__licenses)):
+            if key is None:
+                continue
+
+            if (s := stats.get(key)) is None:
+                s = stats[key] = {'count': 0, 'total': 0.0, 'max': 0.0}
+
+            s['count'] += 1
+            s['total'] += event.duration
+            s['max'] = max(s['max'], event.duration)
+
+    def summary(self) -> t.Dict[str, t.Any]:
+        return {
+            'elapsed': time.perf_counter() - self.__start,
+            'phases': {k: dict(v) for k, v in self.__phases.items()},
+            'licenses': {k: dict(v) for k, v in self.__licenses.items()}
+        }
+
+    def report(self, licenses: int = 10) -> str:
+        """
+        Formats the breakdown by phase and the licenses with the most time spent in their checks.
+        Phases may be nested, e.g. push includes assert, so their times do not add up to the elapsed time.
+        """
+        summary = self.summary()
+
+        lines = [f'{"phase":10} {"count":>8} {"total [s]":>10} {"mean [ms]":>10} {"max [ms]":>10}']
+        for phase in sorted(summary['phases'], key=lambda k: PHASES.index(k) if k in PHASES else len(PHASES)):
+            s = summary['phases'][phase]
+            lines.append(f'{phase:10} {s["count"]:8d} {s["total"]:10.3f} {1000 * s["total"] / s["count"]:10.2f} {1000 * s["max"]:10.2f}')
+
+        if summary['licenses']:
+            lines.append('')
+            lines.append(f'{"license":30} {"events":>8} {"total [s]":>10}')
+            for lic, s in sorted(summary['licenses'].items(), key=lambda i: -i[1]['total'])[:licenses]:
+                lines.append(f'{lic:30} {s["count"]:8d} {s["total"]:10.3f}')
+
+        lines.append('')
+        lines.append(f'elapsed {summary["elapsed"]:.3f}s')
+        return '\n'.join(lines)
+
+
+_instrumentation: t.Optional[Instrumentation] = None
+
+
+def setInstrumentation(instrumentation: t.Optional[Instrumentation]):
+    """
+    Sets the instrumentation of the engines created afterwards and of loading the definitions.
+    """
+    global _instrumentation
+    _instrumentation = instrumentation
+
+
+def getInstrumentation() -> t.Optional[Instrumentation]:
+    return _instrumentation
@@ -46,17 +46,28 @@ between them:
        extends this set of atoms maximally to a satisfying set.
 """
 
+import time
+
 from z3 import *
 
 
+class UnknownResult(Exception):
+    """
+    Raised if the solver cannot decide a subset, e.g. because its time or resource limit is exceeded.
+    """
+    pass
+
+
 def get_id(x):
     return Z3_get_ast_id(x.ctx.ref(), x.as_ast())
 
 
 class SubsetSolver:
-    def __init__(self, constraints, solver):
+    def __init__(self, constraints, solver, background=None, before_check=None):
         self.s = solver
         self.constraints = constraints
+        self.background = list(background) if background else []
+        self.before_check = before_check
         self.n = len(constraints)
         self.idcache = {}
         self.varcache = {}
@@ -75,8 +86,13 @@ class SubsetSolver:
         return self.varcache[i]
 
     def check_subset(self, seed):
-        assumptions = self.to_c_lits(seed)
-        return self.s.check(assumptions) == sat
+        assumptions = self.to_c_lits(seed) + self.background
+        if self.before_check is not None:
+            self.before_check()
+        result = self.s.check(assumptions)
+        if result == unknown:
+            raise UnknownResult(self.s.reason_unknown())
+        return result == sat
 
     def to_c_lits(self, seed):
         return [self.c_var(i) for i in seed]
@@ -86,7 +102,7 @@ class SubsetSolver:
 
     def seed_from_core(self):
         core = self.s.unsat_core()
-        return [self.idcache[get_id(x)] for x in core]
+        return [self.idcache[get_id(x)] for x in core if get_id(x) in self.idcache]
 
     def shrink(self, seed):
         current = set(seed)
@@ -163,4 +179,26 @@ def enumerate_sets(csolver, map):
         else:
             MUS = csolver.shrink(seed)
             yield "MUS", csolver.to_c_lits(MUS)
-            map.block_up(MUS)
\ No newline at end of file
+            map.block_up(MUS)
+
+def enumerate_muses(csolver, map, limit=None, deadline=None, muses=None):
+    """
+    MUS enumeration without growing satisfiable seeds into MSSes, a satisfiable seed only blocks its subsets.
+    Stops after limit cores or when the deadline (time.monotonic()) passes.
+    Returns the cores and whether the enumeration is complete.
+    The cores are appended to muses, if given, which holds the cores found so far if UnknownResult is raised.
+    """
+    if muses is None:
+        muses = []
+    while True:
+        seed = map.next_seed()
+        if seed is None:
+            return muses, True
+        if (limit is not None and len(muses) >= limit) or (deadline is not None and time.monotonic() >= deadline):
+            return muses, False
+        if csolver.check_subset(seed):
+            map.block_down(seed)
+        else:
+            MUS = csolver.shrink(seed)
+            muses.append(csolver.to_c_lits(MUS))
+            map.block_up(MUS)
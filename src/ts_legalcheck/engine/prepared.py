@@ -0,0 +1,69 @@
+import json
+import typing as t
+
+import z3
+
+from .tables import Substitution
+
+
+# Maximal number of use-cases prepared by an engine, the least recently prepared one is dropped first
+MAX_USE_CASES = 16
+
+Pairs = t.List[t.Tuple[z3.ExprRef, z3.ExprRef]]
+
+
+def useCaseKey(properties: t.Dict[str, t.Any]) -> str:
+    return json.dumps(properties, sort_keys=True)
+
+
+class PreparedUseCase(object):
+    """
+    Module and component properties of a use-case substituted into the facts instantiated for the checks.
+    The facts are reduced once per license and component properties and reused for all components with these properties
+    checked under the use-case. The reduced facts are split into their conjuncts, the conjuncts, which are true, are left out.
+    """
+    def __init__(self, 
+                 properties: t.Dict[str, t.Any], 
+                 substitution: Pairs, 
+                 component: t.Callable[[str, bool], t.Tuple[z3.ExprRef, z3.ExprRef]]):
+        self.__properties = dict(properties)
+        self.__substitution = substitution
+        self.__component = component
+        self.__reduced: t.Dict[t.Tuple[t.Any, ...], t.List[z3.BoolRef]] = {}
+
+    @property
+    def key(self) -> str:
+        return useCaseKey(self.__properties)
+
+    @property
+    def properties(self) -> t.Dict[str, t.Any]:
+        return self.__properties
+
+    def reduce(self, 
+               key: t.Tuple[t.Any, ...], 
+               facts: t.List[z3.BoolRef], 
+               components: t.Optional[t.Dict[str, t.Any]] = None) -> t.List[z3.BoolRef]:
+        """
+        Returns the facts with the module and the given component properties replaced by their values and simplified.
+        The result is cached under the key identifying the facts together with the component properties.
+        """
+        components = components or {}
+        key = key + (useCaseKey(components),)
+
+        if (reduced := self.__reduced.get(key)) is not None:
+            return reduced
+
+        substitution = self.__substitution + [self.__component(k, v) for k, v in components.items()]
+
+        # The conjunction of the facts is simplified at once, the result is split into its conjuncts
+        reduced = []
+        if facts:
+            ctx = facts[0].ctx
+            args = (z3.Ast * len(facts))(*(f.as_ast() for f in facts))
+            fact = z3.BoolRef(z3.Z3_mk_and(ctx.ref(), len(facts), args), ctx)
+            fact = z3.simplify(Substitution(substitution, ctx)(fact) if substitution else fact)
+
+            reduced = [t.cast(z3.BoolRef, f) for f in (fact.children() if z3.is_and(fact) else [fact]) if not z3.is_true(f)]
+
+        self.__reduced[key] = reduced
+        return reduced
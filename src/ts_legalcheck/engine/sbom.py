@@ -0,0 +1,330 @@
+import re
+import json
+import logging
+import typing as t
+
+from pathlib import Path
+
+from .context import Component
+
+
+logger = logging.getLogger('ts_legalcheck.engine')
+
+
+# Formats of the SBOMs
+FORMAT_CYCLONEDX = 'cyclonedx'
+FORMAT_SPDX = 'spdx'
+
+# Top-level arrays of the components, which are read one at a time
+COMPONENT_ARRAYS = {'components': FORMAT_CYCLONEDX, 'packages': FORMAT_SPDX}
+
+# Top-level values describing the document, all other values are skipped without decoding,
+# e.g. dependencies, relationships or files, which may be as large as the components
+HEADER_KEYS = ('bomFormat', 'specVersion', 'serialNumber', 'metadata', 'spdxVersion', 'SPDXID', 'name')
+
+# Number of characters read at once
+CHUNK_SIZE = 1 << 16
+
+# SPDX license expression operators and values, which do not name a license
+_OPERATORS = {'AND', 'OR'}
+_NO_LICENSE = {'NOASSERTION', 'NONE', ''}
+
+_TOKEN = re.compile(r'[()]|[^\s()]+')
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_STRING = re.compile(r'["\\]')
+
+
+class SBOMError(Exception):
+    pass
+
+
+class LicenseMapper(object):
+    """
+    Maps the license IDs of an SBOM to the license keys of the model. IDs are matched case-insensitively,
+    deprecated and current SPDX IDs of the same license are interchangeable, i.e. GPL-2.0 and GPL-2.0-only
+    as well as GPL-2.0+ and GPL-2.0-or-later. Aliases map further IDs, e.g. LicenseRefs, to keys.
+    IDs without a key are kept, so that their checks are reported as unknown.
+    """
+    def __init__(self, keys: t.Iterable[str], aliases: t.Optional[t.Dict[str, str]] = None):
+        self.__keys = {k.lower(): k for k in keys}
+        self.__aliases = {k.lower(): v for k, v in (aliases or {}).items()}
+
+    @staticmethod
+    def __equivalents(key: str) -> t.List[str]:
+        if key.endswith('+'):
+            return [key, key[:-1] + '-or-later']
+        elif key.endswith('-or-later'):
+            return [key, key[:-len('-or-later')] + '+']
+        elif key.endswith('-only'):
+            return [key, key[:-len('-only')]]
+        else:
+            return [key, key + '-only']
+
+    def __find(self, key: str) -> t.Optional[str]:
+        if (mapped := self.__aliases.get(key)) is not None:
+            return mapped
+
+        for k in LicenseMapper.__equivalents(key):
+            if (mapped := self.__keys.get(k)) is not None:
+                return mapped
+
+        return None
+
+    def map(self, lic: str, exception: t.Optional[str] = None) -> str:
+        """
+        Returns the key of the license, with an exception the key of the license with the exception, e.g.
+        GPL-2.0-only WITH Classpath-exception-2.0. The license without the exception is used,
+        if the model has no key for the combination.
+        """
+        key = lic.strip().lower()
+
+        if exception:
+            suffix = f' with {exception.strip().lower()}'
+            if (mapped := self.__aliases.get(key + suffix)) is not None:
+                return mapped
+
+            for k in LicenseMapper.__equivalents(key):
+                if (mapped := self.__keys.get(k + suffix)) is not None:
+                    return mapped
+
+        if (mapped := self.__find(key)) is not None:
+            return mapped
+
+        return lic.strip()
+
+    def expression(self, expr: str) -> t.List[str]:
+        """
+        Returns the keys of the licenses of an SPDX license expression. Every license of the expression,
+        together with its exception (WITH), is checked on its own.
+        """
+        result = []
+
+        tokens = _TOKEN.findall(expr)
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            i += 1
+
+            if token in '()' or token.upper() in _OPERATORS or token.upper() in _NO_LICENSE:
+                continue
+
+            # An exception not following a license, e.g. of a parenthesized expression, is left out
+            if token.upper() == 'WITH':
+                i += 1
+                continue
+
+            exception = None
+            if i + 1 < len(tokens) and tokens[i].upper() == 'WITH':
+                exception = tokens[i + 1]
+                i += 2
+
+            if (key := self.map(token, exception)) not in result:
+                result.append(key)
+
+        return result
+
+
+class _JSONStream(object):
+    """
+    Reads a JSON object incrementally. The values of the top-level keys are either decoded,
+    streamed one element at a time if they are arrays of interest, or skipped.
+    """
+    def __init__(self, fp: t.TextIO):
+        self.__fp = fp
+        self.__buf = ''
+        self.__pos = 0
+        self.__eof = False
+        self.__decoder = json.JSONDecoder()
+
+    def __fill(self, size: int = CHUNK_SIZE) -> bool:
+        if self.__eof:
+            return False
+
+        # The consumed characters are dropped
+        if self.__pos > CHUNK_SIZE:
+            self.__buf = self.__buf[self.__pos:]
+            self.__pos = 0
+
+        data = self.__fp.read(size)
+        if not data:
+            self.__eof = True
+            return False
+
+        self.__buf += data
+        return True
+
+    def __peek(self) -> str:
+        while True:
+            while self.__pos < len(self.__buf) and self.__buf[self.__pos] in ' \t\r\n':
+                self.__pos += 1
+
+            if self.__pos < len(self.__buf):
+                return self.__buf[self.__pos]
+
+            if not self.__fill():
+                raise SBOMError('Unexpected end of the document')
+
+    def __expect(self, chars: str) -> str:
+        if (c := self.__peek()) not in chars:
+            raise SBOMError(f'Expected {" or ".join(chars)} at {c!r}')
+
+        self.__pos += 1
+        return c
+
+    def __decode(self) -> t.Any:
+        self.__peek()
+
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buf, self.__pos)
+
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.__buf) or self.__eof:
+                    self.__pos = end
+                    return value
+
+            except json.JSONDecodeError as err:
+                if self.__eof:
+                    raise SBOMError(f'Invalid JSON: {err.msg}')
+
+            # Large values are read in growing chunks, so that they are not decoded too often
+            self.__fill(max(CHUNK_SIZE, len(self.__buf) - self.__pos))
+
+    def __skip(self):
+        if self.__peek() not in '[{':
+            self.__decode()
+            return
+
+        depth = 0
+        while True:
+            if (m := _STRUCTURE.search(self.__buf, self.__pos)) is None:
+                self.__pos = len(self.__buf)
+                if not self.__fill():
+                    raise SBOMError('Unexpected end of the document')
+                continue
+
+            self.__pos = m.end()
+            c = m.group()
+
+            if c == '"':
+                self.__skipString()
+            elif c in '[{':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def __skipString(self):
+        while True:
+            if (m := _STRING.search(self.__buf, self.__pos)) is None or m.end() == len(self.__buf):
+                # An escape at the end of the buffer needs the next character
+                self.__pos = m.start() if m is not None else len(self.__buf)
+                if not self.__fill():
+                    raise SBOMError('Unexpected end of the document')
+                continue
+
+            if m.group() == '"':
+                self.__pos = m.end()
+                return
+
+            self.__pos = m.end() + 1
+
+    def items(self, decoded: t.Iterable[str], streamed: t.Iterable[str]) -> t.Iterator[t.Tuple[str, t.Any, bool]]:
+        """
+        Yields the top-level keys with the decoded values and the elements of the streamed arrays,
+        the last item tells whether the value is an element of a streamed array.
+        """
+        decoded, streamed = set(decoded), set(streamed)
+
+        self.__expect('{')
+        if self.__peek() == '}':
+            return
+
+        while True:
+            key = self.__decode()
+            self.__expect(':')
+
+            if key in streamed and self.__peek() == '[':
+                self.__pos += 1
+                if self.__peek() != ']':
+                    while True:
+                        yield key, self.__decode(), True
+                        if self.__expect(',]') == ']':
+                            break
+                else:
+                    self.__pos += 1
+
+            elif key in decoded:
+                yield key, self.__decode(), False
+            else:
+                self.__skip()
+
+            if self.__expect(',}') == '}':
+                return
+
+
+def _cyclonedxComponents(comp: t.Dict[str, t.Any], mapper: LicenseMapper, properties: t.Dict[str, bool]) -> t.Iterator[Component]:
+    licenses = []
+    for entry in comp.get('licenses', []):
+        if expr := entry.get('expression'):
+            ids = mapper.expression(expr)
+        elif lic := entry.get('license'):
+            # Names are free text, they are mapped as a whole, e.g. by an alias
+            if lic.get('id'):
+                ids = mapper.expression(lic['id'])
+            else:
+                ids = [mapper.map(lic['name'])] if lic.get('name', '').strip().upper() not in _NO_LICENSE else []
+        else:
+            ids = []
+
+        licenses.extend(l for l in ids if l not in licenses)
+
+    key = comp.get('bom-ref') or comp.get('purl') or f'{comp.get("name", "")}@{comp.get("version", "")}'
+    nested = comp.pop('components', [])
+
+    yield Component(key, dict(properties), licenses)
+
+    for c in nested:
+        yield from _cyclonedxComponents(c, mapper, properties)
+
+
+def _spdxComponent(pkg: t.Dict[str, t.Any], mapper: LicenseMapper, properties: t.Dict[str, bool]) -> Component:
+    # The declared licenses are used, unless they are not asserted
+    licenses = mapper.expression(pkg.get('licenseDeclared', ''))
+    if not licenses:
+        licenses = mapper.expression(pkg.get('licenseConcluded', ''))
+
+    key = pkg.get('SPDXID') or f'{pkg.get("name", "")}@{pkg.get("versionInfo", "")}'
+    return Component(key, dict(properties), licenses)
+
+
+def readComponents(path: Path,
+                   mapper: LicenseMapper,
+                   properties: t.Optional[t.Dict[str, bool]] = None) -> t.Iterator[Component]:
+    """
+    Reads the components of a CycloneDX or SPDX SBOM in the JSON format one at a time.
+    The licenses are mapped to the keys of the model, all components get the given properties.
+    Only a single component is decoded at a time, so that the memory does not grow with the size of the SBOM.
+    """
+    properties = properties or {}
+
+    with path.open('r', encoding='utf-8') as fp:
+        stream = _JSONStream(fp)
+        header: t.Dict[str, t.Any] = {}
+
+        for key, value, element in stream.items(HEADER_KEYS, COMPONENT_ARRAYS.keys()):
+            if not element:
+                header[key] = value
+                continue
+
+            if not isinstance(value, dict):
+                raise SBOMError(f'Invalid component in {key}')
+
+            if COMPONENT_ARRAYS[key] == FORMAT_CYCLONEDX:
+                yield from _cyclonedxComponents(value, mapper, properties)
+            else:
+                yield _spdxComponent(value, mapper, properties)
+
+        if not header.get('bomFormat') and not header.get('spdxVersion'):
+            logger.warning(f'{str(path)} is neither a CycloneDX nor an SPDX document')
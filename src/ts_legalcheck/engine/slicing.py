@@ -0,0 +1,153 @@
+import typing as t
+
+from dataclasses import dataclass
+
+import z3
+
+
+@dataclass
+class RuleFacts:
+    """
+    Facts of a rule grounded for the module and component constants of the checks and a license constant,
+    together with the license names and the module and component properties they refer to.
+    A rule is guarded by its license names, if it holds whenever the license has none of the names.
+    """
+    key: str
+    facts: t.List[z3.BoolRef]
+    names: t.FrozenSet[str]
+    guarded: bool
+    properties: t.Tuple[t.Tuple[str, str, z3.BoolRef], ...]
+
+
+class RuleIndex(object):
+    """
+    Index of the rules to the license names and the properties they refer to. It selects the rules, which may
+    affect the check of a license for the given properties: the other rules hold in every model of the remaining
+    facts, so that leaving them out changes neither the verdict nor the minimal unsatisfiable subsets.
+
+    A rule is left out, if
+      - it is guarded by license names, which are not the name of the checked license and are not referred to by
+        any rule kept for the license, so that the solver can assume that the license has none of the names, or
+      - its facts are true for the values of the module and component properties, e.g. as its setting does not hold.
+    """
+    def __init__(self,
+                 rules: t.Dict[str, t.List[z3.BoolRef]],
+                 facts: t.List[z3.BoolRef],
+                 types,
+                 constraints: t.Dict[str, t.Any],
+                 consts: t.Dict[str, z3.ExprRef]):
+        self.__types = types
+        self.__consts = consts
+        self.__keys = {c.constKey: k for k, c in constraints.items()}
+
+        self.__rules = {k: self.__index(k, f) for k, f in rules.items()}
+
+        # License names of the facts, which are not rules, cannot be assumed not to hold
+        self.__names: t.Set[str] = set()
+        for f in facts:
+            self.__names.update(self.__refs(f)[0])
+
+        self.__slices: t.Dict[str, t.Set[str]] = {}
+        self.__vacuous: t.Dict[t.Tuple[t.Any, ...], bool] = {}
+
+    def __refs(self, fact: z3.ExprRef) -> t.Tuple[t.Dict[str, z3.BoolRef], t.Dict[t.Tuple[str, str], z3.BoolRef]]:
+        """
+        Collects the license name atoms of the license constant and the property atoms of the module and component constants
+        """
+        dt = self.__types
+        m, c, l = self.__consts['Module'], self.__consts['Component'], self.__consts['License']
+
+        names: t.Dict[str, z3.BoolRef] = {}
+        props: t.Dict[t.Tuple[str, str], z3.BoolRef] = {}
+
+        visited = set()
+        todo = [fact]
+        while todo:
+            e = todo.pop()
+            if e.get_id() in visited:
+                continue
+
+            visited.add(e.get_id())
+            if not z3.is_app(e):
+                continue
+
+            d = e.decl()
+            if d.eq(dt.LicenseName) and e.arg(0).eq(l) and z3.is_string_value(e.arg(1)):
+                names[t.cast(z3.SeqRef, e.arg(1)).as_string()] = t.cast(z3.BoolRef, e)
+
+            elif (d.eq(dt.ModuleConstraint) and e.arg(0).eq(m)) or (d.eq(dt.ComponentConstraint) and e.arg(0).eq(c)):
+                cnstr = e.arg(1)
+                if z3.is_app(cnstr) and cnstr.num_args() == 1 and z3.is_int_value(cnstr.arg(0)):
+                    if (key := self.__keys.get(t.cast(z3.IntNumRef, cnstr.arg(0)).as_long())) is not None:
+                        props[('Module' if d.eq(dt.ModuleConstraint) else 'Component', key)] = t.cast(z3.BoolRef, e)
+
+            todo.extend(e.children())
+
+        return names, props
+
+    def __index(self, key: str, facts: t.List[z3.BoolRef]) -> RuleFacts:
+        names: t.Dict[str, z3.BoolRef] = {}
+        props: t.Dict[t.Tuple[str, str], z3.BoolRef] = {}
+
+        for f in facts:
+            n, p = self.__refs(f)
+            names.update(n)
+            props.update(p)
+
+        guarded = bool(names) and RuleIndex.__holds(facts, [(a, z3.BoolVal(False, a.ctx)) for a in names.values()])
+
+        return RuleFacts(key, facts, frozenset(names), guarded, tuple((s, k, a) for (s, k), a in sorted(props.items())))
+
+    @staticmethod
+    def __holds(facts: t.List[z3.BoolRef], substitution: t.List[t.Tuple[z3.BoolRef, z3.BoolRef]]) -> bool:
+        return all(z3.is_true(z3.simplify(z3.substitute(f, *substitution) if substitution else f)) for f in facts)
+
+    def slice(self, name: str) -> t.Set[str]:
+        """
+        Returns the keys of the rules, which may affect licenses of the given name.
+        Rules guarded by other names are kept, if any kept rule refers to one of their names.
+        """
+        if (kept := self.__slices.get(name)) is not None:
+            return kept
+
+        kept = {k for k, r in self.__rules.items() if not r.guarded or name in r.names}
+        names = self.__names.union(*(self.__rules[k].names for k in kept))
+
+        changed = True
+        while changed:
+            changed = False
+            for k, r in self.__rules.items():
+                if k not in kept and r.names & names:
+                    kept.add(k)
+                    names |= r.names
+                    changed = True
+
+        self.__slices[name] = kept
+        return kept
+
+    def relevant(self, key: str, name: str, modProps: t.Dict[str, bool], compProps: t.Dict[str, bool]) -> bool:
+        """
+        Checks whether the rule may affect the check of a license of the given name for the property values.
+        """
+        if (rule := self.__rules.get(key)) is None:
+            return True
+
+        if key not in self.slice(name):
+            return False
+
+        values = tuple((modProps if s == 'Module' else compProps).get(k) for s, k, _ in rule.properties)
+        if (vacuous := self.__vacuous.get((key, name in rule.names, values))) is None:
+            ctx = self.__consts['License'].ctx
+
+            substitution = [(a, z3.BoolVal(bool(v), ctx)) for (_, _, a), v in zip(rule.properties, values) if v is not None]
+            if name in rule.names:
+                substitution.append((self.__nameAtom(name), z3.BoolVal(True, ctx)))
+
+            vacuous = RuleIndex.__holds(rule.facts, substitution)
+            self.__vacuous[(key, name in rule.names, values)] = vacuous
+
+        return not vacuous
+
+    def __nameAtom(self, name: str) -> z3.BoolRef:
+        l = self.__consts['License']
+        return t.cast(z3.BoolRef, self.__types.LicenseName(l, z3.StringVal(name, l.ctx)))
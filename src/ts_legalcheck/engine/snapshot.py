@@ -0,0 +1,141 @@
+import os
+import json
+import hashlib
+import logging
+import typing as t
+
+import z3
+
+from pathlib import Path
+
+
+logger = logging.getLogger('ts_legalcheck.engine')
+
+SNAPSHOT_VERSION = 1
+
+
+def fingerprint(path: Path) -> t.Dict[str, t.Any]:
+    """
+    Identifies the content of a definitions file.
+    """
+    stat = path.stat()
+    return {
+        'path': str(path.resolve()),
+        'mtime': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': hashlib.sha256(path.read_bytes()).hexdigest()
+    }
+
+
+def isFresh(fp: t.Dict[str, t.Any]) -> bool:
+    """
+    Checks whether the file described by the fingerprint is unchanged.
+    The content hash is only computed if the file metadata differ.
+    """
+    path = Path(fp['path'])
+    if not path.exists():
+        return False
+
+    stat = path.stat()
+    if stat.st_mtime_ns == fp['mtime'] and stat.st_size == fp['size']:
+        return True
+
+    return hashlib.sha256(path.read_bytes()).hexdigest() == fp['sha256']
+
+
+def declarations(assertions: t.Iterable[z3.ExprRef]) -> t.List[z3.FuncDecl]:
+    """
+    Collects the uninterpreted functions and constants used by the assertions.
+    """
+    decls = {}
+    visited = set()
+    todo = list(assertions)
+
+    while todo:
+        e = todo.pop()
+        if e.get_id() in visited:
+            continue
+
+        visited.add(e.get_id())
+
+        if z3.is_quantifier(e):
+            todo.append(e.body())
+        elif z3.is_app(e):
+            d = e.decl()
+            if d.kind() == z3.Z3_OP_UNINTERPRETED:
+                decls[d.get_id()] = d
+
+            todo.extend(e.children())
+
+    return list(decls.values())
+
+
+def toSMT2(assertions: t.Sequence[z3.ExprRef]) -> str:
+    """
+    Serializes the assertions as SMT-LIB2 commands. The datatypes are not declared, 
+    they must be provided as sorts when parsing.
+    """
+    lines = [d.sexpr() for d in declarations(assertions)]
+    lines.extend(f'(assert {a.sexpr()})' for a in assertions)
+    return '\n'.join(lines)
+
+
+def directories(paths: t.Iterable[Path]) -> t.Dict[str, int]:
+    """
+    Modification times of the directories containing the definition files.
+    They change when files are added or removed, e.g. from a directory referenced by a glob include.
+    """
+    dirs = {str(p.resolve().parent) for p in paths}
+    return {d: Path(d).stat().st_mtime_ns for d in sorted(dirs)}
+
+
+def write(path: Path, data: t.Dict[str, t.Any]):
+    data = dict(data, version=SNAPSHOT_VERSION, z3=z3.get_version_string())
+
+    # Every process writes its own file, so that concurrent writers, e.g. parallel CI jobs, do not interfere
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with tmp.open('w') as fp:
+        json.dump(data, fp)
+
+    tmp.replace(path)
+
+
+def read(path: Path, validate: bool = True) -> t.Optional[t.Dict[str, t.Any]]:
+    """
+    Reads a snapshot. Returns None if the snapshot cannot be used, i.e. it was created
+    by an incompatible version or, if validation is enabled, any of its sources has changed.
+    """
+    try:
+        with path.open('r') as fp:
+            data = json.load(fp)
+    except (OSError, json.JSONDecodeError) as err:
+        logger.error(f'Cannot read snapshot {str(path)}: {err}')
+        return None
+
+    if data.get('version') != SNAPSHOT_VERSION or data.get('z3') != z3.get_version_string():
+        logger.info(f'Snapshot {str(path)} was created by an incompatible version')
+        return None
+
+    if validate:
+        for fp in data.get('sources', []):
+            if not isFresh(fp):
+                logger.info(f'Snapshot {str(path)} is outdated: {fp["path"]} has changed')
+                return None
+
+        for d, mtime in data.get('directories', {}).items():
+            if not Path(d).exists() or Path(d).stat().st_mtime_ns != mtime:
+                logger.info(f'Snapshot {str(path)} is outdated: content of {d} has changed')
+                return None
+
+    return data
+
+
+def roots(path: Path) -> t.List[Path]:
+    """
+    Definition files the snapshot has been compiled from.
+    """
+    try:
+        with path.open('r') as fp:
+            return [Path(p) for p in json.load(fp).get('roots', [])]
+    except (OSError, json.JSONDecodeError):
+        return []
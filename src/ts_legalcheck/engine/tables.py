@@ -0,0 +1,659 @@
+import time
+import logging
+import itertools
+import collections
+import typing as t
+
+import z3
+
+from .context import Module, Component
+from .constraints import License
+
+
+logger = logging.getLogger('ts_legalcheck.engine')
+
+# Operations of the circuit nodes
+OP_CONST, OP_VAR, OP_NOT, OP_AND, OP_OR, OP_EQ, OP_XOR, OP_ITE = range(8)
+
+# Maximal depth of definitions referring to other definitions
+MAX_DEFINITION_DEPTH = 16
+
+# Maximal number of unknown facts shared by violated rules, which are enumerated instead of calling the solver
+MAX_UNKNOWN_FACTS = 10
+
+# Maximal number of steps of the search for the unknown facts satisfying the rules
+MAX_SEARCH_STEPS = 1024
+
+# Values of the three-valued evaluation, None stands for a value not determined by the use-case
+Value = t.Optional[bool]
+
+
+class Circuit(object):
+    """
+    Boolean circuit over the module and component properties.
+    The nodes are stored in topological order, each node is a pair of the operation and its operands:
+    the value of a constant, the index of a variable or the indices of the operand nodes.
+    Variables without a name stand for facts which are not fixed by the use-case.
+    The keys of the variables, i.e. their printed atoms, order them independently of the Z3 terms they were built from.
+    """
+    def __init__(self):
+        self.nodes: t.List[t.Tuple[int, t.Any]] = []
+        self.variables: t.List[t.Optional[str]] = []
+        self.keys: t.List[str] = []
+
+        self.__nodes: t.Dict[int, int] = {}
+        self.__vars: t.Dict[int, int] = {}
+        self.__supports: t.List[t.FrozenSet[int]] = []
+
+        # Ids of the expressions are only unique as long as the expressions are alive
+        self.__exprs: t.List[z3.ExprRef] = []
+
+    def __node(self, op: int, args) -> int:
+        self.nodes.append((op, args))
+        return len(self.nodes) - 1
+
+    def __var(self, e: z3.ExprRef, atomName: t.Callable[[z3.ExprRef], t.Optional[str]]) -> int:
+        if (i := self.__vars.get(e.get_id())) is None:
+            i = len(self.variables)
+            self.variables.append(atomName(e))
+            self.keys.append(e.sexpr())
+            self.__vars[e.get_id()] = i
+
+        return self.__node(OP_VAR, i)
+
+    def add(self, expr: z3.ExprRef, atomName: t.Callable[[z3.ExprRef], t.Optional[str]]) -> int:
+        """
+        Adds the boolean expression to the circuit and returns the index of its node.
+        Uninterpreted atoms are mapped to variables named by atomName.
+        """
+        todo = [expr]
+
+        while todo:
+            e = todo[-1]
+            if e.get_id() in self.__nodes:
+                todo.pop()
+                continue
+
+            k = e.decl().kind() if z3.is_app(e) else None
+
+            if k in (z3.Z3_OP_TRUE, z3.Z3_OP_FALSE):
+                self.__nodes[e.get_id()] = self.__node(OP_CONST, k == z3.Z3_OP_TRUE)
+                todo.pop()
+                continue
+
+            boolean = k in (z3.Z3_OP_AND, z3.Z3_OP_OR, z3.Z3_OP_NOT, z3.Z3_OP_IMPLIES, z3.Z3_OP_XOR, z3.Z3_OP_ITE) or \
+                (k in (z3.Z3_OP_EQ, z3.Z3_OP_DISTINCT) and e.num_args() == 2 and z3.is_bool(e.arg(0)))
+
+            if not boolean:
+                self.__nodes[e.get_id()] = self.__var(e, atomName)
+                todo.pop()
+                continue
+
+            children = e.children()
+            pending = [c for c in children if c.get_id() not in self.__nodes]
+            if pending:
+                todo.extend(pending)
+                continue
+
+            args = tuple(self.__nodes[c.get_id()] for c in children)
+
+            if k == z3.Z3_OP_AND:
+                i = self.__node(OP_AND, args)
+            elif k == z3.Z3_OP_OR:
+                i = self.__node(OP_OR, args)
+            elif k == z3.Z3_OP_NOT:
+                i = self.__node(OP_NOT, args[0])
+            elif k == z3.Z3_OP_IMPLIES:
+                i = self.__node(OP_OR, (self.__node(OP_NOT, args[0]), args[1]))
+            elif k == z3.Z3_OP_EQ:
+                i = self.__node(OP_EQ, args)
+            elif k == z3.Z3_OP_ITE:
+                i = self.__node(OP_ITE, args)
+            else:
+                i = self.__node(OP_XOR, args)
+
+            self.__nodes[e.get_id()] = i
+            todo.pop()
+
+        self.__exprs.append(expr)
+        return self.__nodes[expr.get_id()]
+
+    def order(self, variables: t.Iterable[int], first: t.AbstractSet[int] = frozenset()) -> t.List[int]:
+        """
+        Indices of the variables sorted by their keys, the given variables first. The indices depend on the order
+        of the arguments of the Z3 terms, which changes with the terms created before, e.g. by earlier checks.
+        """
+        return sorted(variables, key=lambda v: (v not in first, self.keys[v], v))
+
+    def support(self, node: int) -> t.FrozenSet[int]:
+        """
+        Indices of the variables the node depends on.
+        """
+        for op, args in self.nodes[len(self.__supports):]:
+            if op == OP_CONST:
+                self.__supports.append(frozenset())
+            elif op == OP_VAR:
+                self.__supports.append(frozenset([args]))
+            elif op == OP_NOT:
+                self.__supports.append(self.__supports[args])
+            else:
+                self.__supports.append(frozenset().union(*(self.__supports[i] for i in args)))
+
+        return self.__supports[node]
+
+    def cone(self, nodes: t.Iterable[int]) -> t.List[int]:
+        """
+        Indices of the given nodes and all nodes they depend on, in topological order.
+        """
+        visited = set()
+        todo = list(nodes)
+
+        while todo:
+            i = todo.pop()
+            if i in visited:
+                continue
+
+            visited.add(i)
+
+            op, args = self.nodes[i]
+            if op == OP_NOT:
+                todo.append(args)
+            elif op not in (OP_CONST, OP_VAR):
+                todo.extend(args)
+
+        return sorted(visited)
+
+    def evaluate(self,
+                 values: t.Dict[str, bool],
+                 assigned: t.Optional[t.Dict[int, bool]] = None,
+                 default: Value = None,
+                 nodes: t.Optional[t.Iterable[int]] = None,
+                 result: t.Optional[t.List[Value]] = None) -> t.List[Value]:
+        """
+        Evaluates the nodes for the given values of the variables. Variables can also be assigned
+        by their indices, the remaining ones get the default value.
+        If nodes are given, only they are reevaluated in a copy of the result of a previous evaluation.
+        """
+        variables = [values.get(name, default) if name else default for name in self.variables]
+        for i, v in (assigned or {}).items():
+            variables[i] = v
+
+        if nodes is None:
+            nodes = range(len(self.nodes))
+            result = [None] * len(self.nodes)
+        else:
+            result = list(t.cast(t.List[Value], result))
+
+        for n in nodes:
+            op, args = self.nodes[n]
+
+            if op == OP_CONST:
+                v = args
+            elif op == OP_VAR:
+                v = variables[args]
+            elif op == OP_NOT:
+                v = None if (a := result[args]) is None else not a
+            elif op == OP_AND:
+                vs = [result[i] for i in args]
+                v = False if False in vs else (None if None in vs else True)
+            elif op == OP_OR:
+                vs = [result[i] for i in args]
+                v = True if True in vs else (None if None in vs else False)
+            elif op == OP_ITE:
+                c, a, b = (result[i] for i in args)
+                v = (a if c else b) if c is not None else (a if a == b else None)
+            else:
+                a, b = (result[i] for i in args)
+                v = None if a is None or b is None else ((a == b) if op == OP_EQ else (a != b))
+
+            result[n] = v
+
+        return result
+
+
+class LicenseTable(object):
+    """
+    Rules and obligations of a single license compiled into a circuit over the module and component properties.
+    """
+    def __init__(self,
+                 key: str,
+                 circuit: Circuit,
+                 hard: t.List[int],
+                 rules: t.List[t.Tuple[str, int]],
+                 obligations: t.List[t.Tuple[str, int]],
+                 defined: t.Set[str]):
+        self.key = key
+        self.circuit = circuit
+        self.hard = hard
+        self.rules = rules
+        self.obligations = obligations
+        self.defined = defined
+
+        # Searches assign the facts in a fixed order, the obligations first, so that they hold only if required
+        self.__first = frozenset().union(*(circuit.support(i) for _, i in obligations))
+
+        # Facts which are disjunctions with a fact, e.g. lower bounds of a property, force the fact
+        # to hold if the rest of the disjunction does not
+        self.implications: t.List[t.Tuple[int, t.List[int]]] = []
+        for i in hard:
+            op, args = circuit.nodes[i]
+            if op == OP_OR and (vs := [a for a in args if circuit.nodes[a][0] == OP_VAR]):
+                v = min(vs, key=lambda a: circuit.keys[circuit.nodes[a][1]])
+                self.implications.append((circuit.nodes[v][1], [a for a in args if a != v]))
+
+    @property
+    def variables(self) -> t.Set[str]:
+        return {v for v in self.circuit.variables if v}
+
+    def __search(self,
+                 values: t.Dict[str, bool],
+                 result: t.List[Value],
+                 nodes: t.List[int],
+                 variables: t.List[int]) -> t.Tuple[bool, t.Optional[t.Dict[int, bool]]]:
+        """
+        Searches an assignment of the unknown facts satisfying all nodes, preferring facts which do not hold.
+        Returns whether the search has completed and the assignment, if any.
+        """
+        cone = self.circuit.cone(nodes)
+        steps = 0
+
+        todo: t.List[t.Dict[int, bool]] = [{}]
+        while todo:
+            assigned = todo.pop()
+
+            steps += 1
+            if steps > MAX_SEARCH_STEPS:
+                return False, None
+
+            r = self.circuit.evaluate(values, assigned, nodes=cone, result=result)
+            vs = [r[i] for i in nodes]
+
+            if False in vs:
+                continue
+            if None not in vs:
+                return True, assigned
+
+            v = variables[len(assigned)]
+            todo.append({**assigned, v: True})
+            todo.append({**assigned, v: False})
+
+        return True, None
+
+    def __solve(self,
+                values: t.Dict[str, bool],
+                result: t.List[Value],
+                group: t.List[t.Tuple[t.Optional[str], int]],
+                variables: t.List[int]) -> t.Optional[t.Tuple[t.Set[str], t.Dict[int, bool]]]:
+        """
+        Enumerates the assignments of the unknown facts shared by a group of rules.
+        Returns the rules contained in any minimal unsatisfiable subset and the first assignment,
+        which satisfies all other rules.
+        """
+        cone = self.circuit.cone(i for _, i in group)
+        rules = {key for key, _ in group if key is not None}
+
+        models = []
+        for bits in itertools.product((False, True), repeat=len(variables)):
+            assigned = dict(zip(variables, bits))
+            r = self.circuit.evaluate(values, assigned, nodes=cone, result=result)
+
+            if all(r[i] for key, i in group if key is None):
+                models.append((frozenset(key for key, i in group if key is not None and r[i]), assigned))
+
+        if not models:
+            return None
+
+        # Rules of the minimal unsatisfiable subsets are the ones missing in any maximal satisfiable subset
+        satisfiable = {s for s, _ in models}
+        violated = set().union(*(rules - s for s in satisfiable if not any(s < o for o in satisfiable)))
+
+        return violated, next(a for s, a in models if rules - violated <= s)
+
+    def propagate(self, values: t.Dict[str, bool], default: Value = None) -> t.List[Value]:
+        """
+        Evaluates the circuit, the unknown facts get the default value unless they are forced to hold by the implications.
+        """
+        circuit = self.circuit
+        assigned: t.Dict[int, bool] = {}
+
+        while True:
+            result = circuit.evaluate(values, assigned, default=default)
+
+            forced = [v for v, others in self.implications
+                      if v not in assigned and circuit.variables[v] not in values and all(result[o] is False for o in others)]
+            if not forced:
+                return result
+
+            assigned.update((v, True) for v in forced)
+
+    def evaluate(self, values: t.Dict[str, bool]) -> t.Optional[t.Tuple[t.List[str], t.List[str]]]:
+        """
+        Returns the violated rules and the obligations for the given property values.
+
+        Facts not fixed by the values, e.g. properties missing in the use-case, are chosen to satisfy the rules.
+        Facts neither fixed by the values nor required by any rule are assumed not to hold.
+        Returns None if this requires the solver, i.e. rules share too many unknown facts, or the values
+        set a property which is defined by the license.
+        """
+        if not self.defined.isdisjoint(values):
+            return None
+
+        circuit = self.circuit
+        result = circuit.evaluate(values)
+
+        if any(result[i] is False for i in self.hard):
+            return None
+
+        # Unknown facts are assumed not to hold unless forced by the facts, if this satisfies all rules,
+        # which are not violated anyway
+        forced = self.propagate(values)
+        closed = self.propagate(values, default=False)
+        if all(closed[i] for i in self.hard) and all(closed[i] or forced[i] is False for _, i in self.rules):
+            violations = [key for key, i in self.rules if forced[i] is False]
+            obligations = [key for key, i in self.obligations if closed[i]]
+
+            return violations, obligations
+
+        unknown = {i for i, name in enumerate(circuit.variables) if not name or name not in values}
+
+        pending: t.List[t.Optional[t.Tuple[t.Optional[str], int]]] = \
+            [(key, i) for key, i in [(None, i) for i in self.hard] + self.rules if result[i] is None]
+        supports = [circuit.support(i) & unknown for _, i in t.cast(t.List[t.Tuple[t.Optional[str], int]], pending)]
+        assigned = {}
+
+        # Facts and rules satisfied by a single unknown fact, which they do not share with any other, 
+        # are independent of the rest. Obligations are left to the search, which assumes them not to hold if possible
+        shared = {v for v, n in collections.Counter(v for s in supports for v in s).items() if n > 1}
+        for n, ((key, i), support) in enumerate(zip(pending, supports)):
+            for v, b in itertools.product(circuit.order(support - shared - self.__first), (False, True)):
+                if circuit.evaluate(values, {v: b}, nodes=circuit.cone([i]), result=result)[i]:
+                    assigned[v] = b
+                    pending[n] = None
+                    break
+
+        # Remaining facts and rules are grouped by the unknown facts they share
+        groups: t.List[t.Tuple[t.List[t.Tuple[t.Optional[str], int]], t.Set[int]]] = []
+        for item in pending:
+            if item is None:
+                continue
+
+            key, i = item
+            group, support = [(key, i)], set(circuit.support(i) & unknown)
+            for g in [g for g in groups if not g[1].isdisjoint(support)]:
+                groups.remove(g)
+                group.extend(g[0])
+                support |= g[1]
+
+            groups.append((group, support))
+
+        violated = {key for key, i in self.rules if result[i] is False}
+
+        for group, support in groups:
+            completed, model = self.__search(values, result, [i for _, i in group], circuit.order(support, self.__first))
+
+            if model is not None:
+                assigned.update(model)
+                continue
+
+            # Some of the rules are violated, their minimal unsatisfiable subsets are enumerated
+            if not completed or len(support) > MAX_UNKNOWN_FACTS:
+                return None
+
+            if (solved := self.__solve(values, result, group, circuit.order(support, self.__first))) is None:
+                return None
+
+            violated |= solved[0]
+            assigned.update(solved[1])
+
+        result = circuit.evaluate(values, assigned, default=False)
+
+        violations = [key for key, _ in self.rules if key in violated]
+        obligations = [key for key, i in self.obligations if result[i]]
+
+        return violations, obligations
+
+
+class Substitution(object):
+    """
+    Substitution of many expressions at once, the arrays passed to Z3 are built only once.
+    """
+    def __init__(self, pairs: t.List[t.Tuple[z3.ExprRef, z3.ExprRef]], ctx: z3.Context):
+        self.__ctx = ctx
+        self.__pairs = pairs
+        self.__src = (z3.Ast * len(pairs))()
+        self.__dst = (z3.Ast * len(pairs))()
+
+        for i, (a, b) in enumerate(pairs):
+            self.__src[i] = a.as_ast()
+            self.__dst[i] = b.as_ast()
+
+    def __call__(self, e: z3.BoolRef) -> z3.BoolRef:
+        return z3.BoolRef(z3.Z3_substitute(self.__ctx.ref(), e.as_ast(), len(self.__pairs), self.__src, self.__dst), self.__ctx)
+
+
+def compileLicense(engine, lic: License) -> LicenseTable:
+    """
+    Compiles the facts of the engine instantiated for the license into a decision table.
+
+    Facts defining a constraint of the component or the license (rights, terms, obligations, license values)
+    are substituted into the rules and obligations, which are left as functions of the module and component properties.
+    """
+    types = engine.types
+    ctx = engine.context
+
+    m_const = types.Module.mkModule(0)
+    c_const = types.Component.mkComponent(0)
+    l_const = lic.const(types)
+
+    keys = {c.constKey: k for k, c in engine.constraints.items()}
+
+    # The structure of the checked module is known
+    known = Substitution([(types.ModuleComponent(m_const, c_const), z3.BoolVal(True, ctx)),
+                           (types.ComponentLicense(c_const, l_const), z3.BoolVal(True, ctx))], ctx)
+
+    definitions: t.Dict[int, t.Tuple[z3.ExprRef, z3.ExprRef]] = {}
+    rules: t.Dict[str, t.List[z3.BoolRef]] = {}
+    hard: t.List[z3.BoolRef] = []
+
+    def isAtom(e: z3.ExprRef) -> bool:
+        return z3.is_app(e) and e.decl().kind() == z3.Z3_OP_UNINTERPRETED and z3.is_bool(e)
+
+    def define(atom: z3.ExprRef, value: z3.ExprRef):
+        # Facts of other licenses are irrelevant
+        if (atom.decl().eq(types.LicenseConstraint) or atom.decl().eq(types.LicenseName)) and not atom.arg(0).eq(l_const):
+            return
+
+        if atom.get_id() in definitions:
+            hard.append(atom == value)
+        else:
+            definitions[atom.get_id()] = (atom, value)
+
+    for tag, fact in engine.groundFacts(lic):
+        fact = z3.simplify(known(fact))
+
+        if tag:
+            rules.setdefault(tag, []).append(fact)
+
+        elif isAtom(fact):
+            define(fact, z3.BoolVal(True, ctx))
+
+        elif z3.is_not(fact) and isAtom(fact.arg(0)):
+            define(fact.arg(0), z3.BoolVal(False, ctx))
+
+        elif z3.is_eq(fact) and isAtom(fact.arg(0)):
+            define(fact.arg(0), fact.arg(1))
+
+        elif z3.is_eq(fact) and isAtom(fact.arg(1)):
+            define(fact.arg(1), fact.arg(0))
+
+        elif not z3.is_true(fact):
+            hard.append(fact)
+
+    # A pair of implications A -> x and x -> A defines the atom x, e.g. an obligation by its variants.
+    # All candidate pairs are matched and the atoms are defined in the order of their printed form,
+    # so that the definitions do not depend on the order of the arguments of the Z3 terms
+    lower: t.Dict[int, t.List[t.Tuple[int, z3.ExprRef, z3.ExprRef]]] = {}
+    upper: t.Dict[int, t.List[t.Tuple[int, z3.ExprRef]]] = {}
+
+    for n, fact in enumerate(hard):
+        if not z3.is_or(fact):
+            continue
+
+        args = fact.children()
+        for j, a in enumerate(args):
+            rest = args[:j] + args[j + 1:]
+            if isAtom(a) and a.get_id() not in definitions:
+                lower.setdefault(a.get_id(), []).append((n, a, z3.simplify(z3.Not(z3.Or(rest, ctx)))))
+            elif z3.is_not(a) and isAtom(a.arg(0)) and a.arg(0).get_id() not in definitions:
+                upper.setdefault(a.arg(0).get_id(), []).append((n, z3.simplify(z3.Or(rest, ctx))))
+
+    consumed = set()
+    for k in sorted(lower.keys() & upper.keys(), key=lambda k: lower[k][0][1].sexpr()):
+        for (n, atom, value), (u, bound) in itertools.product(lower[k], upper[k]):
+            if bound.eq(value) and not consumed.intersection((n, u)):
+                definitions[k] = (atom, value)
+                consumed.update((n, u))
+                break
+
+    hard = [f for n, f in enumerate(hard) if n not in consumed]
+
+    substitute = Substitution(list(definitions.values()), ctx)
+
+    # Definitions may refer to other definitions, e.g. settings of obligations to rights and terms
+    def resolve(e: z3.BoolRef) -> z3.BoolRef:
+        for _ in range(MAX_DEFINITION_DEPTH):
+            r = substitute(e)
+            if r.eq(e):
+                break
+            e = r
+
+        return t.cast(z3.BoolRef, z3.simplify(e))
+
+    def atomName(e: z3.ExprRef) -> t.Optional[str]:
+        if e.num_args() == 2 and z3.is_app(e.arg(1)) and e.arg(1).decl().eq(types.Constraint.constructor(0)):
+            key = keys.get(e.arg(1).arg(0).as_long())
+            if key is not None:
+                if e.decl().eq(types.ModuleConstraint) and e.arg(0).eq(m_const):
+                    return f'Module.{key}'
+                if e.decl().eq(types.ComponentConstraint) and e.arg(0).eq(c_const):
+                    return f'Component.{key}'
+
+        return None
+
+    circuit = Circuit()
+
+    hard = [resolve(f) for f in hard]
+    hard = [c for f in hard for c in (f.children() if z3.is_and(f) else [f]) if not z3.is_true(c)]
+
+    return LicenseTable(
+        key=lic.key,
+        circuit=circuit,
+        hard=[circuit.add(f, atomName) for f in hard],
+        rules=[(k, circuit.add(resolve(z3.And(facts, ctx)), atomName)) for k, facts in rules.items()],
+        obligations=[(k, circuit.add(resolve(engine.makeComponentCnstrExpr(k, c_const)), atomName)) for k in engine.obligations],
+        defined={n for a, _ in definitions.values() if (n := atomName(a))}
+    )
+
+
+class FastEngine(object):
+    """
+    Answers the checks by evaluating decision tables compiled from the engine, without calling the solver.
+    Licenses, whose verdict or obligations are not determined by the properties of the module and the component,
+    are checked by the engine.
+    """
+    def __init__(self, engine):
+        self.__engine = engine
+        self.__tables: t.Dict[str, LicenseTable] = {}
+        self.__stats = {'tables': 0, 'solver': 0}
+
+    @property
+    def engine(self):
+        return self.__engine
+
+    @property
+    def statistics(self) -> t.Dict[str, int]:
+        """
+        Number of license checks answered by the tables and by the solver
+        """
+        return self.__stats
+
+    def table(self, key: str) -> t.Optional[LicenseTable]:
+        if (table := self.__tables.get(key)) is None:
+            if (lic := self.__engine.licenses.get(key)) is None:
+                return None
+
+            table = self.__tables[key] = compileLicense(self.__engine, lic)
+
+        return table
+
+    def compile(self):
+        """
+        Compiles the tables of all licenses upfront.
+        """
+        start = time.perf_counter()
+
+        for key in self.__engine.licenses:
+            self.table(key)
+
+        logger.info(f'Decision tables of {len(self.__tables)} licenses compiled in {time.perf_counter() - start:.2f}s')
+
+
+    def checkLicense(self, mod: Module, comp: Component, key: str, extended_results: bool = True, values: t.Optional[t.Dict[str, bool]] = None):
+        table = self.table(key)
+        if table is None:
+            logging.warning(f'License {key} is not defined in the engine. Skipping...')
+            return {
+                'status': 'UNKNOWN',
+                'reason': 'License could not be matched correctly'
+            }
+
+        if values is None:
+            values = properties(mod, comp)
+
+        if (evaluated := table.evaluate(values)) is None:
+            self.__stats['solver'] += 1
+
+            shard = Module(mod.key, mod.properties)
+            return self.__engine.checkModule(shard, extended_results=extended_results,
+                                             comps=[Component(comp.key, comp.properties, [key])])[comp.key][key]
+
+        self.__stats['tables'] += 1
+
+        violations, obligations = evaluated
+        if extended_results:
+            names = self.__engine.obligations
+            obligations = [f"{names[k] if names[k] else 'Unknown'} ({k})" for k in obligations]
+
+        if violations:
+            return {
+                'status': 'UNSAT',
+                'rules': violations,
+                'explanation': 'complete',
+                'obligations': obligations
+            }
+
+        return {
+            'status': 'SAT',
+            'obligations': obligations
+        }
+
+
+    def checkComponent(self, mod: Module, comp: Component, extended_results: bool = True, lics: t.Optional[t.Iterable[str]] = None):
+        values = properties(mod, comp)
+        return {l: self.checkLicense(mod, comp, l, extended_results=extended_results, values=values) for l in (lics or comp.licenses)}
+
+
+    def checkModule(self, mod: Module, extended_results: bool = True, comps: t.Optional[t.Iterable[Component]] = None):
+        if not comps:
+            comps = mod.components
+
+        return {c.key: self.checkComponent(mod, c, extended_results=extended_results) for c in comps}
+
+
+def properties(mod: Module, comp: Component) -> t.Dict[str, bool]:
+    """
+    Values of the module and component properties as named in the decision tables
+    """
+    values = {f'Module.{k}': v for k, v in mod.properties.items()}
+    values.update({f'Component.{k}': v for k, v in comp.properties.items()})
+    return values
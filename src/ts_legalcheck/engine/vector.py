@@ -0,0 +1,273 @@
+import time
+import logging
+import typing as t
+
+import numpy as np
+
+from .context import Module, Component
+from .tables import FastEngine, LicenseTable, OP_CONST, OP_VAR, OP_NOT, OP_AND, OP_OR, OP_EQ, OP_ITE
+
+
+logger = logging.getLogger('ts_legalcheck.engine')
+
+# Three-valued values of the circuit nodes packed into bit arrays, a value is unknown if neither bit is set
+_Packed = t.Tuple[np.ndarray, np.ndarray]
+
+
+class MatrixResult(object):
+    """
+    Results of checking use-cases given as rows of a property matrix.
+    violations[l, r, i] is set if the rule rules[i] is violated by the use-case r for the license licenses[l],
+    obligations[l, r, i] is set if the obligation obligations[i] applies.
+    """
+    def __init__(self,
+                 licenses: t.List[str],
+                 rules: t.List[str],
+                 obligations: t.List[str],
+                 violations: np.ndarray,
+                 required: np.ndarray,
+                 individual: int):
+        self.licenses = licenses
+        self.rules = rules
+        self.obligations = obligations
+        self.violations = violations
+        self.required = required
+        self.individual = individual
+
+    @property
+    def allowed(self) -> np.ndarray:
+        """
+        allowed[l, r] is set if the license licenses[l] can be used in the use-case r
+        """
+        return ~self.violations.any(axis=2)
+
+    def result(self, lic: str, row: int) -> t.Dict[str, t.Any]:
+        """
+        Result of a single check in the format of the engine, without extended results.
+        """
+        l = self.licenses.index(lic)
+
+        violations = [k for k, v in zip(self.rules, self.violations[l, row]) if v]
+        obligations = [k for k, v in zip(self.obligations, self.required[l, row]) if v]
+
+        if violations:
+            return {'status': 'UNSAT', 'rules': violations, 'explanation': 'complete', 'obligations': obligations}
+
+        return {'status': 'SAT', 'obligations': obligations}
+
+
+def columns(mod: t.Iterable[str], comp: t.Iterable[str]) -> t.List[str]:
+    """
+    Names of the matrix columns for the module and component properties
+    """
+    return [f'Module.{k}' for k in mod] + [f'Component.{k}' for k in comp]
+
+
+def fromUseCases(useCases: t.Iterable[t.Dict[str, t.Any]]) -> t.Tuple[np.ndarray, t.List[str]]:
+    """
+    Turns use-cases with module and component settings, as the presets, into a matrix and the names of its columns.
+    Settings missing in a use-case do not hold.
+    """
+    useCases = list(useCases)
+
+    mod = sorted({k for u in useCases for k in u.get('module', {})})
+    comp = sorted({k for u in useCases for k in u.get('component', {})})
+
+    values = np.array([[bool(u.get('module', {}).get(k, False)) for k in mod] +
+                       [bool(u.get('component', {}).get(k, False)) for k in comp] for u in useCases], dtype=bool)
+
+    return values.reshape(len(useCases), len(mod) + len(comp)), columns(mod, comp)
+
+
+def _evaluate(table: LicenseTable,
+              inputs: t.Dict[str, np.ndarray],
+              size: int,
+              unknown: bool,
+              nodes: t.Iterable[int],
+              assigned: t.Optional[t.Dict[int, np.ndarray]] = None) -> t.Dict[int, _Packed]:
+    """
+    Evaluates the nodes of the table circuit with three-valued logic on packed rows.
+    Variables without input are unknown or, if unknown is False, do not hold. Assigned variables hold for the set bits.
+    """
+    assigned = assigned or {}
+
+    ones = np.full(size, 0xFF, dtype=np.uint8)
+    zeros = np.zeros(size, dtype=np.uint8)
+
+    circuit = table.circuit
+    result: t.Dict[int, _Packed] = {}
+
+    for n in nodes:
+        op, args = circuit.nodes[n]
+
+        if op == OP_CONST:
+            v = (ones, zeros) if args else (zeros, ones)
+        elif op == OP_VAR:
+            name = circuit.variables[args]
+            if name is not None and (bits := inputs.get(name)) is not None:
+                v = (bits, ~bits)
+            elif (bits := assigned.get(args)) is not None:
+                v = (bits, zeros) if unknown else (bits, ~bits)
+            else:
+                v = (zeros, zeros) if unknown else (zeros, ones)
+        elif op == OP_NOT:
+            a = result[args]
+            v = (a[1], a[0])
+        elif op == OP_AND:
+            v = (np.bitwise_and.reduce([result[i][0] for i in args]), np.bitwise_or.reduce([result[i][1] for i in args]))
+        elif op == OP_OR:
+            v = (np.bitwise_or.reduce([result[i][0] for i in args]), np.bitwise_and.reduce([result[i][1] for i in args]))
+        elif op == OP_ITE:
+            (ct, cf), (at, af), (bt, bf) = (result[i] for i in args)
+            v = ((ct & at) | (cf & bt) | (at & bt), (ct & af) | (cf & bf) | (af & bf))
+        else:
+            (at, af), (bt, bf) = (result[i] for i in args)
+            same, other = (at & bt) | (af & bf), (at & bf) | (af & bt)
+            v = (same, other) if op == OP_EQ else (other, same)
+
+        result[n] = v
+
+    return result
+
+
+def _distinct(values: np.ndarray) -> t.Tuple[np.ndarray, np.ndarray]:
+    """
+    Distinct rows of the matrix and the indices of the distinct row for every row.
+    """
+    if values.shape[1] < 64:
+        keys = values.astype(np.uint64) @ (np.uint64(1) << np.arange(values.shape[1], dtype=np.uint64))
+        _, index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        return values[index], inverse.reshape(-1)
+
+    unique, inverse = np.unique(values, axis=0, return_inverse=True)
+    return unique, inverse.reshape(-1)
+
+
+def _propagate(table: LicenseTable, inputs: t.Dict[str, np.ndarray], size: int, unknown: bool) -> t.Dict[int, _Packed]:
+    """
+    Evaluates the circuit on packed rows as LicenseTable.propagate() does.
+    """
+    circuit = table.circuit
+    nodes = range(len(circuit.nodes))
+    implications = [(v, others) for v, others in table.implications if circuit.variables[v] not in inputs]
+
+    ones = np.full(size, 0xFF, dtype=np.uint8)
+    zeros = np.zeros(size, dtype=np.uint8)
+
+    assigned: t.Dict[int, np.ndarray] = {}
+
+    while True:
+        result = _evaluate(table, inputs, size, unknown, nodes, assigned)
+
+        changed = False
+        for v, others in implications:
+            bits = assigned.get(v, zeros)
+            forced = bits | (np.bitwise_and.reduce([result[o][1] for o in others]) if others else ones)
+
+            if not np.array_equal(forced, bits):
+                assigned[v] = forced
+                changed = True
+
+        if not changed:
+            return result
+
+
+def checkMatrix(fast: FastEngine,
+                values: np.ndarray,
+                names: t.List[str],
+                licenses: t.Iterable[str]) -> MatrixResult:
+    """
+    Checks the licenses for every use-case given as a row of the boolean matrix values, whose columns
+    are the properties named as returned by columns(). Properties without a column are not fixed.
+
+    The decision tables of the licenses are evaluated for all distinct rows at once as bitwise operations.
+    Use-cases whose verdict depends on facts not fixed by the properties are checked one by one
+    by the fast engine, which falls back to the solver if needed.
+    """
+    start = time.perf_counter()
+
+    values = np.asarray(values, dtype=bool)
+    if values.ndim != 2 or values.shape[1] != len(names):
+        raise ValueError(f'Matrix of shape (use-cases, {len(names)}) is expected, got {values.shape}')
+
+    engine = fast.engine
+    rules = list(engine.rules.keys())
+    obligations = list(engine.obligations.keys())
+
+    ruleIndex = {k: i for i, k in enumerate(rules)}
+    obligationIndex = {k: i for i, k in enumerate(obligations)}
+
+    tables: t.List[t.Tuple[str, LicenseTable]] = []
+    for key in licenses:
+        if (table := fast.table(key)) is None:
+            logger.warning(f'License {key} is not defined in the engine. Skipping...')
+        else:
+            tables.append((key, table))
+
+    rows = values.shape[0]
+
+    violations = np.zeros((len(tables), rows, len(rules)), dtype=bool)
+    required = np.zeros((len(tables), rows, len(obligations)), dtype=bool)
+    individual = 0
+
+    for l, (key, table) in enumerate(tables):
+        # Rows are distinct only in the properties the table depends on
+        relevant = table.variables | table.defined
+        cols = [i for i, name in enumerate(names) if name in relevant]
+
+        unique, inverse = _distinct(values[:, cols])
+        count = unique.shape[0]
+
+        size = (count + 7) // 8
+        inputs = {names[c]: np.packbits(unique[:, j]) for j, c in enumerate(cols)}
+
+        hard = table.hard
+        tagged = [i for _, i in table.rules]
+
+        decided = np.ones(count, dtype=bool)
+        violated = np.zeros((count, len(rules)), dtype=bool)
+        holds = np.zeros((count, len(obligations)), dtype=bool)
+
+        if table.defined.isdisjoint(inputs):
+            kleene = _propagate(table, inputs, size, True)
+            closed = _propagate(table, inputs, size, False)
+
+            # Rows whose closed evaluation violates a fact or rule are checked individually
+            bits = np.full(size, 0xFF, dtype=np.uint8)
+            for i in hard:
+                bits &= closed[i][0]
+            for i in tagged:
+                bits &= closed[i][0] | kleene[i][1]
+
+            decided = np.unpackbits(bits, count=count).astype(bool)
+
+            for k, i in table.rules:
+                violated[:, ruleIndex[k]] = np.unpackbits(kleene[i][1], count=count).astype(bool)
+
+            for k, i in table.obligations:
+                holds[:, obligationIndex[k]] = np.unpackbits(closed[i][0], count=count).astype(bool)
+        else:
+            decided[:] = False
+
+        for r in np.flatnonzero(~decided):
+            props = dict(zip((names[c] for c in cols), (bool(v) for v in unique[r])))
+            mod = Module('matrix', {k[len('Module.'):]: v for k, v in props.items() if k.startswith('Module.')})
+            comp = Component(f'row{r}', {k[len('Component.'):]: v for k, v in props.items() if k.startswith('Component.')}, [key])
+
+            checked = fast.checkLicense(mod, comp, key, extended_results=False, values=props)
+            individual += 1
+
+            violated[r] = False
+            holds[r] = False
+            for k in checked.get('rules', []):
+                violated[r, ruleIndex[k]] = True
+            for k in checked.get('obligations', []):
+                holds[r, obligationIndex[k]] = True
+
+        violations[l] = violated[inverse]
+        required[l] = holds[inverse]
+
+    logger.info(f'{rows} use-cases of {len(tables)} licenses checked in {time.perf_counter() - start:.2f}s, '
+                f'{individual} distinct use-cases checked individually')
+
+    return MatrixResult([k for k, _ in tables], rules, obligations, violations, required, individual)
@@ -0,0 +1,25 @@
+"""
+Options of the engine, which are needed by the command line interface without loading the engine
+"""
+
+# Facts over all modules, components and licenses are asserted as quantified formulas
+ENCODING_QUANTIFIED = 'quantified'
+
+# Facts are instantiated for the module, component and license in scope, 
+# which results in quantifier-free formulas
+ENCODING_GROUNDED = 'grounded'
+
+ENCODINGS = (ENCODING_QUANTIFIED, ENCODING_GROUNDED)
+
+
+# Violated rules are explained by enumerating all minimal unsatisfiable subsets (MUS) 
+# together with the maximal satisfiable subsets
+EXPLAIN_ALL = 'all'
+
+# Only MUSes are enumerated, possibly bounded by the number of cores and time
+EXPLAIN_MUS = 'mus'
+
+# Only the first MUS is extracted from the unsatisfiable core of the check
+EXPLAIN_FIRST = 'first'
+
+EXPLANATIONS = (EXPLAIN_ALL, EXPLAIN_MUS, EXPLAIN_FIRST)
@@ -7,7 +7,7 @@ from dataclasses import dataclass, asdict
 from .engine import Engine
 from .engine.context import Component, Module
 
-from .utils import load_file
+from .utils import load_file, logger
 
 @dataclass
 class Result:
@@ -34,6 +34,9 @@ def test_license(engine: Engine, lic: str, situation_file: Path) -> t.Optional[R
     m = create_test_module(situation, [lic])
     result = engine.checkModule(m)['test'][lic]
 
+    if result['status'] == 'UNKNOWN':
+        logger.warning(f'License {lic} could not be checked: {result.get("reason")}')
+
     warnings = []
     violations = []
 
@@ -1,6 +1,17 @@
 # Init file for ts_legalcheck.ui package
 
-from .app import app
+import os
+
+from .app import app, pool, get_models, MODELS_DIR
+
+def run(port, warmup=False, watch=False):
+  # With the reloader, the app is served by a child process, the engines are only built and watched there
+  serving = os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
+
+  if warmup and serving:
+    pool.warmup(MODELS_DIR / m for m in get_models())
+
+  if watch and serving:
+    pool.watch()
 
-def run(port):
   app.run(debug=True, host="0.0.0.0", port=port)
\ No newline at end of file
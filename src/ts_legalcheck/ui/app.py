@@ -1,12 +1,17 @@
 import os
+import time
 import toml
 import typing as t
 
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, abort, g
 
-from ts_legalcheck.engine import loadDefinitions, createEngineWithDefinitions
 from ts_legalcheck.testing import create_test_module
+from ts_legalcheck.engine.cache import ResultCache, DEFAULT_CACHE_SIZE
+from ts_legalcheck.engine.instrumentation import setInstrumentation
+
+from .pool import EnginePool
+from .metrics import Registry, Histogram, Gauge, EngineMetrics
 
 
 app = Flask(__name__)
@@ -15,6 +20,72 @@ MODELS_DIR = Path(os.environ.get('TS_LEGALCHECK_MODELS_PATH', 'data'))
 PRESETS_DIR = Path(os.environ.get('TS_LEGALCHECK_PRESETS_PATH', MODELS_DIR / 'use-cases/presets'))
 LEGALSETTINGS_FILE = Path(os.environ.get('TS_LEGALCHECK_LEGALSETTINGS_PATH', MODELS_DIR / 'use-cases/LegalSettings.toml'))
 
+# Result cache shared by all engines, configured by the same environment variables as the command line interface
+def create_cache() -> t.Optional[ResultCache]:
+    path = os.environ.get('TS_LEGALCHECK_CACHE')
+    size = os.environ.get('TS_LEGALCHECK_CACHE_SIZE')
+
+    if not path and not size:
+        return None
+
+    return ResultCache(Path(path) if path else None, size=int(size) * 1024 * 1024 if size else DEFAULT_CACHE_SIZE)
+
+# Budgets of the checks, a request exceeding them gets UNKNOWN results instead of blocking a worker
+def create_options() -> t.Dict[str, t.Any]:
+    options: t.Dict[str, t.Any] = {'prepareUseCases': os.environ.get('TS_LEGALCHECK_PREPARE', '').lower() in ('1', 'true', 'yes')}
+    for key, env, ty in (('checkTimeout', 'TS_LEGALCHECK_CHECK_TIMEOUT', float),
+                         ('checkRlimit', 'TS_LEGALCHECK_CHECK_RLIMIT', int),
+                         ('moduleTimeout', 'TS_LEGALCHECK_MODULE_TIMEOUT', float),
+                         ('moduleRlimit', 'TS_LEGALCHECK_MODULE_RLIMIT', int)):
+        if value := os.environ.get(env):
+            options[key] = ty(value)
+
+    return options
+
+# Pre-built engines per model, shared by all requests
+pool = EnginePool(size=int(os.environ.get('TS_LEGALCHECK_POOL_SIZE', 4)), cache=create_cache(), options=create_options())
+
+
+# Metrics of the service, the solver checks are recorded by the instrumentation of all engines
+registry = Registry()
+setInstrumentation(EngineMetrics(registry))
+
+request_latency = registry.register(Histogram('ts_legalcheck_http_request_duration_seconds', 'Latency of the HTTP requests per route'))
+
+def collect_pool(key: str) -> t.List[t.Tuple[t.Dict[str, str], float]]:
+    return [({'model': model}, stats[key]) for model, stats in pool.utilization().items()]
+
+def collect_cache(*keys: str) -> t.List[t.Tuple[t.Dict[str, str], float]]:
+    stats = pool.cache.statistics if pool.cache is not None else {}
+    return [({}, stats[k]) for k in keys if k in stats]
+
+registry.register(Gauge('ts_legalcheck_engine_build_seconds', 'Time of the last engine build or reload per model', lambda: collect_pool('buildTime')))
+registry.register(Gauge('ts_legalcheck_engine_builds_total', 'Engine builds per model', lambda: collect_pool('builds'), type='counter'))
+registry.register(Gauge('ts_legalcheck_engine_reloads_total', 'Engine reloads of changed definitions per model', lambda: collect_pool('reloads'), type='counter'))
+registry.register(Gauge('ts_legalcheck_pool_engines', 'Engines of the pool per model', lambda: collect_pool('created')))
+registry.register(Gauge('ts_legalcheck_pool_engines_busy', 'Engines checked out by requests per model', lambda: collect_pool('busy')))
+registry.register(Gauge('ts_legalcheck_pool_size', 'Maximal number of engines per model', lambda: collect_pool('size')))
+registry.register(Gauge('ts_legalcheck_cache_hits_total', 'Hits of the result cache', lambda: collect_cache('hits'), type='counter'))
+registry.register(Gauge('ts_legalcheck_cache_misses_total', 'Misses of the result cache', lambda: collect_cache('misses'), type='counter'))
+registry.register(Gauge('ts_legalcheck_cache_disk_hits_total', 'Hits of the on-disk tier of the result cache', lambda: collect_cache('diskHits'), type='counter'))
+registry.register(Gauge('ts_legalcheck_cache_evictions_total', 'Evictions from the in-memory tier of the result cache', lambda: collect_cache('evictions'), type='counter'))
+registry.register(Gauge('ts_legalcheck_cache_entries', 'Results in the in-memory tier of the result cache', lambda: collect_cache('entries')))
+registry.register(Gauge('ts_legalcheck_cache_bytes', 'Size of the in-memory tier of the result cache', lambda: collect_cache('bytes')))
+
+
+@app.before_request
+def start_timer():
+    g.start = time.perf_counter()
+
+@app.after_request
+def record_latency(response):
+    if (start := g.pop('start', None)) is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        request_latency.observe(time.perf_counter() - start, route=route, method=request.method, status=str(response.status_code))
+
+    return response
+
+
 # Helper to list presets (files in PRESETS_DIR)
 def get_presets() -> t.List[str]:
     if not PRESETS_DIR.exists():
@@ -56,13 +127,17 @@ def get_questions() -> dict:
 def get_licenses(model_file) -> t.List[str]:
     app.logger.info(f"Loading licenses for model: {model_file}")    
     try:
-        defs = loadDefinitions(MODELS_DIR / model_file)        
+        defs = pool.definitions(MODELS_DIR / model_file)
         return list(defs.get('Constraints', {}).keys())
     except Exception as err:
         app.logger.error(f"Error loading licenses")
         app.logger.exception        
         return []
 
+@app.route('/metrics')
+def metrics():
+    return Response(registry.expose(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
 def index():
     models = get_models()
@@ -93,12 +168,15 @@ def test():
       
     app.logger.info(f"Testing licenses: {licenses}")
 
-    defs: dict = loadDefinitions(MODELS_DIR / model) if model else {}
+    if not model:
+        abort(400, 'No model selected')
+
+    defs = pool.definitions(MODELS_DIR / model)
     obligations = { key: obl['description'] for key, obl in defs.get('Obligations', {}).items() }
 
-    engine = createEngineWithDefinitions(defs)
     m = create_test_module(use_case, licenses)
-    check_result = engine.checkModule(m, extended_results=False)['test']
+    with pool.engine(MODELS_DIR / model) as engine:
+        check_result = engine.checkModule(m, extended_results=False)['test']
 
     # Obligations table
     obligations_tbl = []
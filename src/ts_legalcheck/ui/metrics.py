@@ -0,0 +1,147 @@
+import bisect
+import threading
+import typing as t
+
+from ts_legalcheck.engine.instrumentation import Instrumentation, TimingEvent, PHASE_CHECK, PHASE_EXPLAIN
+
+
+# Default buckets of the latency histograms in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = t.Tuple[t.Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Labels, extra: t.Optional[t.Tuple[str, str]] = None) -> str:
+    items = labels + (extra,) if extra else labels
+    if not items:
+        return ''
+
+    return '{' + ','.join(f'{k}="{_escape(str(v))}"' for k, v in items) + '}'
+
+
+def _value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric(object):
+    type = 'untyped'
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+
+    def samples(self) -> t.Iterable[str]:
+        return []
+
+    def expose(self) -> str:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.type}']
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self.__values: t.Dict[Labels, float] = {}
+
+    def inc(self, value: float = 1.0, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self.__values[key] = self.__values.get(key, 0.0) + value
+
+    def samples(self) -> t.Iterable[str]:
+        with self._lock:
+            values = list(self.__values.items())
+
+        return [f'{self.name}{_labels(k)} {_value(v)}' for k, v in values]
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, buckets: t.Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help)
+        self.__buckets = tuple(sorted(buckets))
+        self.__values: t.Dict[Labels, t.Tuple[t.List[int], t.List[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        i = bisect.bisect_left(self.__buckets, value)
+
+        with self._lock:
+            if (entry := self.__values.get(key)) is None:
+                entry = self.__values[key] = ([0] * (len(self.__buckets) + 1), [0.0])
+
+            # Counts per bucket, the cumulative counts are computed on exposition
+            entry[0][i] += 1
+            entry[1][0] += value
+
+    def samples(self) -> t.Iterable[str]:
+        with self._lock:
+            values = [(k, list(c), s[0]) for k, (c, s) in self.__values.items()]
+
+        lines = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.__buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else _value(bound)
+                lines.append(f'{self.name}_bucket{_labels(key, ("le", le))} {cumulative}')
+
+            lines.append(f'{self.name}_sum{_labels(key)} {_value(total)}')
+            lines.append(f'{self.name}_count{_labels(key)} {cumulative}')
+
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    Gauge whose values are collected by a function at exposition, the function returns pairs of labels and values.
+    """
+    type = 'gauge'
+
+    def __init__(self, name: str, help: str, collect: t.Callable[[], t.Iterable[t.Tuple[t.Dict[str, str], float]]], type: str = 'gauge'):
+        super().__init__(name, help)
+        self.type = type
+        self.__collect = collect
+
+    def samples(self) -> t.Iterable[str]:
+        return [f'{self.name}{_labels(tuple(sorted(labels.items())))} {_value(v)}' for labels, v in self.__collect()]
+
+
+class Registry(object):
+    """
+    Metrics exposed in the Prometheus text format
+    """
+    def __init__(self):
+        self.__metrics: t.List[_Metric] = []
+
+    def register(self, metric: _Metric) -> t.Any:
+        self.__metrics.append(metric)
+        return metric
+
+    def expose(self) -> str:
+        return '\n'.join(m.expose() for m in self.__metrics) + '\n'
+
+
+class EngineMetrics(Instrumentation):
+    """
+    Records the solver checks and the explanations of violations of the engines.
+    """
+    def __init__(self, registry: Registry):
+        self.checks = registry.register(Histogram('ts_legalcheck_solver_check_seconds', 'Time of the solver checks'))
+        self.explanations = registry.register(Histogram('ts_legalcheck_explanation_seconds',
+                                                        'Time of the MUS enumerations explaining violations'))
+
+    def emit(self, event: TimingEvent):
+        if event.phase == PHASE_CHECK:
+            self.checks.observe(event.duration)
+        elif event.phase == PHASE_EXPLAIN:
+            self.explanations.observe(event.duration)
@@ -0,0 +1,254 @@
+import time
+import queue
+import logging
+import threading
+import typing as t
+
+from pathlib import Path
+from contextlib import contextmanager
+
+from ts_legalcheck.engine import Engine, createEngineWithDefinitions, loadDefinitionFiles, mergeDefinitions
+from ts_legalcheck.engine import snapshot
+from ts_legalcheck.engine.cache import ResultCache
+from ts_legalcheck.utils import load_file
+
+
+logger = logging.getLogger('ts_legalcheck.ui')
+
+
+class EnginePoolError(Exception):
+    pass
+
+
+class _ModelEngines(object):
+    """
+    Engines of a single model. The template engine is built from the definitions
+    once and is never handed out, pooled engines are forked from it.
+    Given the engines of a previous version of the model, only the changed definitions are loaded.
+    """
+    def __init__(self, 
+                 model: Path, 
+                 size: int, 
+                 cache: t.Optional[ResultCache] = None, 
+                 options: t.Optional[t.Dict[str, t.Any]] = None,
+                 previous: t.Optional['_ModelEngines'] = None):
+        start = time.perf_counter()
+        files = loadDefinitionFiles(model)
+
+        self.model = model
+        self.size = size
+        self.definitions = mergeDefinitions(files)
+
+        if previous is not None:
+            # Files, which cannot be decoded, e.g. while being edited, are skipped when loading the definitions
+            loaded = {p.resolve() for p, _ in files}
+            for p in previous.template.sources:
+                if p.exists() and p.resolve() not in loaded and load_file(p) is None:
+                    raise EnginePoolError(f'Cannot read definitions {p}')
+
+            # The template is also forked by the requests holding the previous engines, Z3 contexts are not thread-safe,
+            # so it is only accessed under its lock and the definitions are reloaded into a private copy
+            with previous.lock:
+                base = previous.template.fork()
+
+            self.template = base.reload(files)
+        else:
+            self.template = createEngineWithDefinitions(self.definitions, files=files)
+            self.template.sources.extend(p for p, _ in files)
+
+        self.template.cache = cache
+        self.template.configure(**(options or {}))
+
+        self.sources = [snapshot.fingerprint(p) for p in self.template.sources]
+        self.directories = snapshot.directories(self.template.sources)
+
+        self.idle: queue.LifoQueue[Engine] = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+        self.checked = time.monotonic()
+
+        # Time in seconds of loading the definitions and building the template engine
+        self.buildTime = time.perf_counter() - start
+
+    def isFresh(self) -> bool:
+        return all(snapshot.isFresh(fp) for fp in self.sources) and \
+            snapshot.directories(self.template.sources) == self.directories
+
+    def refresh(self):
+        """
+        Takes the current state of the definition files as the state of the engines
+        """
+        self.sources = [snapshot.fingerprint(p) for p in self.template.sources if p.exists()]
+        self.directories = snapshot.directories(self.template.sources)
+
+    def acquire(self, timeout: t.Optional[float]) -> Engine:
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self.lock:
+            if self.created < self.size:
+                self.created += 1
+                return self.template.fork()
+
+        try:
+            return self.idle.get(timeout=timeout)
+        except queue.Empty:
+            raise EnginePoolError(f'No engine available for {self.model.name}')
+
+    def release(self, engine: Engine):
+        self.idle.put(engine)
+
+    def discard(self):
+        with self.lock:
+            self.created -= 1
+
+    @property
+    def busy(self) -> int:
+        return self.created - self.idle.qsize()
+
+
+class EnginePool(object):
+    """
+    Bounded pool of pre-built engines per model file.
+    An engine is checked out for the time of a request and returned afterwards.
+    Engines of a model are reloaded when any of its definition files changes: the changed definitions are loaded 
+    into new engines, which replace the previous ones atomically, while running requests finish with the previous engines.
+    If the changed definitions cannot be loaded, the previous engines are kept. The result cache, if given, is shared by all engines, the options are passed to Engine.configure().
+    """
+    def __init__(self, 
+                 size: int = 4, 
+                 timeout: t.Optional[float] = 30.0, 
+                 checkInterval: float = 1.0, 
+                 cache: t.Optional[ResultCache] = None,
+                 options: t.Optional[t.Dict[str, t.Any]] = None):
+        self.__size = size
+        self.__timeout = timeout
+        self.__checkInterval = checkInterval
+        self.__cache = cache
+        self.__options = dict(options or {})
+        self.__builds: t.Dict[str, int] = {}
+        self.__reloads: t.Dict[str, int] = {}
+
+        self.__models: t.Dict[Path, _ModelEngines] = {}
+        self.__building: t.Dict[Path, threading.Lock] = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    @property
+    def cache(self) -> t.Optional[ResultCache]:
+        return self.__cache
+
+    def __get(self, model: Path) -> _ModelEngines:
+        model = model.resolve()
+
+        with self.__lock:
+            entry = self.__models.get(model)
+            lock = self.__building.setdefault(model, threading.Lock())
+
+        if entry is not None:
+            if time.monotonic() - entry.checked < self.__checkInterval:
+                return entry
+
+            # Requests are served by the current engines while another thread checks or reloads the model
+            if not lock.acquire(blocking=False):
+                return entry
+        else:
+            lock.acquire()
+
+        # Models are built and reloaded under their own lock, so that requests for other models are not blocked
+        try:
+            with self.__lock:
+                entry = self.__models.get(model)
+
+            if entry and time.monotonic() - entry.checked >= self.__checkInterval:
+                entry.checked = time.monotonic()
+                if not entry.isFresh():
+                    logger.info(f'Model {model.name} has changed, reloading engines')
+                    try:
+                        reloaded = _ModelEngines(model, self.__size, self.__cache, self.__options, previous=entry)
+                    except Exception:
+                        logger.exception(f'Cannot reload model {model.name}, keeping the previous engines')
+                        entry.refresh()
+                    else:
+                        with self.__lock:
+                            self.__models[model] = entry = reloaded
+                            self.__reloads[model.name] = self.__reloads.get(model.name, 0) + 1
+
+            if entry is None:
+                logger.info(f'Building engines for model {model.name}')
+                entry = _ModelEngines(model, self.__size, self.__cache, self.__options)
+                with self.__lock:
+                    self.__models[model] = entry
+                    self.__builds[model.name] = self.__builds.get(model.name, 0) + 1
+
+            return entry
+        finally:
+            lock.release()
+
+    def warmup(self, models: t.Iterable[Path]):
+        """
+        Builds the engines of the given models upfront.
+        """
+        for model in models:
+            entry = self.__get(model)
+            engines = [entry.acquire(self.__timeout) for _ in range(entry.size)]
+            for engine in engines:
+                entry.release(engine)
+
+    def watch(self) -> threading.Thread:
+        """
+        Checks the definition files of the built models in a background thread, 
+        so that changed models are reloaded before the next request needs them.
+        """
+        def run():
+            while True:
+                time.sleep(self.__checkInterval)
+
+                with self.__lock:
+                    models = list(self.__models)
+
+                for model in models:
+                    try:
+                        self.__get(model)
+                    except Exception:
+                        logger.exception(f'Cannot check model {model.name}')
+
+        thread = threading.Thread(target=run, name='ts-legalcheck-watch', daemon=True)
+        thread.start()
+        return thread
+
+    def definitions(self, model: Path) -> t.Dict[str, t.Any]:
+        return self.__get(model).definitions
+
+    @contextmanager
+    def engine(self, model: Path) -> t.Iterator[Engine]:
+        entry = self.__get(model)
+        engine = entry.acquire(self.__timeout)
+
+        try:
+            yield engine
+        except BaseException:
+            # The engine may be left with open solver scopes
+            entry.discard()
+            raise
+        else:
+            # Engines of a replaced model are dropped
+            if self.__models.get(entry.model) is entry:
+                entry.release(engine)
+
+    def utilization(self) -> t.Dict[str, t.Dict[str, t.Any]]:
+        """
+        Engines per model together with the number of builds and reloads and the time of the last build or reload in seconds
+        """
+        with self.__lock:
+            entries = list(self.__models.values())
+            builds = dict(self.__builds)
+            reloads = dict(self.__reloads)
+
+        return {e.model.name: {'size': e.size, 'created': e.created, 'busy': e.busy, 'builds': builds.get(e.model.name, 0), 
+                               'reloads': reloads.get(e.model.name, 0), 'buildTime': e.buildTime} for e in entries}
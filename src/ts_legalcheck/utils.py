@@ -3,8 +3,6 @@ import logging
 import typing as t
 
 import json
-import toml
-import yaml
 
 from pathlib import Path
 
@@ -40,6 +38,8 @@ def load_file(path: Path) -> t.Optional[dict]:
                 return None
             
         elif path.suffix == '.toml':
+            import toml
+
             try:
                 return toml.load(fp)
             except toml.TomlDecodeError as err:
@@ -47,6 +47,8 @@ def load_file(path: Path) -> t.Optional[dict]:
                 return None
         
         elif path.suffix in ('.yaml', '.yml'):
+            import yaml
+            
             try:
                 return yaml.safe_load(fp)
             except yaml.YAMLError as err: